@@ -1,11 +1,12 @@
-import glob
+import asyncio
+import hashlib
 import os
 import platform
-import re
 import sys
 import json
-import threading
+import time
 import traceback
+from PySide6 import QtAsyncio
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                               QGroupBox, QPushButton, QLineEdit, QLabel, QCheckBox,
                               QListWidget, QMessageBox, QListWidgetItem, QSizePolicy,
@@ -14,39 +15,70 @@ from PySide6.QtCore import Signal, QTimer, Qt, QSize
 from PySide6.QtGui import QDesktopServices, QFont, QColor, QIcon, QPixmap, QPainter
 from PySide6.QtWidgets import QStyle
 from stream_client import Stream
+from search_debouncer import SearchDebouncer
+from category_catalog import CategoryCatalog
+from category_resolver import CategoryResolver
+from worker_pool import WorkerPool
+from local_token import STATE_FILE, LocalTokenError, find_local_token
+from token_validator import TokenValidator
+from token_watcher import TokenWatcher
+from status_poller import LiveStatusPoller, account_snapshot, diff_snapshot
+
+
+ACCOUNT_SNAPSHOT_FILE = "account_snapshot.json"
+
 
 class StreamApp(QMainWindow):
-    update_suggestions = Signal(list)
-    update_ui = Signal()
     token_loaded = Signal(str)
-    show_message = Signal(str, str, str)  # title, message, type (info/error/success)
-    update_loading = Signal(bool)
-    enable_button = Signal(str, bool)  # button_name, enabled
-    set_button_text = Signal(str, str)  # button_name, text
-    set_stream_info = Signal(str, str)  # url, key
-    clear_stream_info = Signal()
+    account_info_changed = Signal(object, dict)  # stream, getInfo payload
     
     def __init__(self):
         super().__init__()
         self.stream = None
         self.game_mask_id = ""
+        # Bumped on every refresh so results for an older token are dropped
+        self._account_generation = 0
+        # Last rendered account fields, so widgets are only touched on change
+        self._account_snapshot = {}
+        self._account_info_stale = False
         self.token_visible_timeout = None
         self.is_loading = False
         self.suppress_donation_reminder = False
+
+        # Blocking calls (requests, file I/O, browser) are awaited on this
+        # fixed-size pool; closing the window waits at most 2s for it
+        self.executor = WorkerPool(max_workers=4, name="StreamApp")
+        self._tasks = set()
+
+        # Every category seen so far, for instant suggestions at startup
+        self.catalog = CategoryCatalog()
+        # name -> game_mask_id, consulted directly by start_stream
+        self.category_resolver = CategoryResolver(self.catalog, self.executor)
+
+        # Keeps can_go_live / app status current without clicking Refresh
+        self.status_poller = LiveStatusPoller(self.poll_account_info, self.handle_polled_account_info)
+
+        # Debounced category search on the asyncio loop (latest query wins)
+        self.search_debouncer = SearchDebouncer(self.search_games, self.update_suggestions_list)
+        # Extra Streamlabs data dirs searched for a local token (config: token_search_roots)
+        self.token_search_roots = []
+        # Stale tokens linger after account switches; pick the live-capable one
+        self.token_validator = TokenValidator()
+        # Browser login: kept between retrievals so re-authentication is quick
+        self.token_retriever = None
+        self.browser_profile_dir = ""
+        self.keep_browser_warm = False
+        self.browser_capture = "cdp"
+        self.resource_blocking = {"enabled": False}
+        # Optional watch mode: picks up the token as soon as Streamlabs writes it
+        self.token_watcher = None
         
         # Cache icons to avoid repeated creation
         self._icon_cache = {}
         
-        # Connect signals first for faster UI responsiveness
-        self.update_suggestions.connect(self.update_suggestions_list)
-        self.update_ui.connect(self.handle_ui_update)
+        # Tokens found outside the GUI thread arrive through this signal
         self.token_loaded.connect(self.handle_token_loaded)
-        self.show_message.connect(self.handle_show_message)
-        self.update_loading.connect(self.handle_update_loading)
-        self.enable_button.connect(self.handle_enable_button)
-        self.set_button_text.connect(self.handle_set_button_text)
-        self.set_stream_info.connect(self.handle_set_stream_info)
-        self.clear_stream_info.connect(self.handle_clear_stream_info)
+        self.account_info_changed.connect(self.handle_account_info_changed)
         
         # Initialize UI
         self.init_ui()
@@ -442,6 +474,12 @@ class StreamApp(QMainWindow):
         load_buttons_row.addWidget(self.load_online_btn)
 
         token_layout.addLayout(load_buttons_row)
+
+        self.watch_token_checkbox = QCheckBox("👀 Auto-load token when Streamlabs logs in")
+        self.watch_token_checkbox.setStyleSheet("padding: 4px;")
+        self.watch_token_checkbox.setToolTip("Watch the Streamlabs desktop app data and load new tokens automatically")
+        self.watch_token_checkbox.toggled.connect(self.set_token_watch)
+        token_layout.addWidget(self.watch_token_checkbox)
         
         # Loading indicator
         self.loading_progress = QProgressBar()
@@ -465,9 +503,9 @@ class StreamApp(QMainWindow):
 
 
         # Account Info Section
-        account_info_label = QLabel("👤 Account Information")
-        account_info_label.setStyleSheet("font-weight: bold; font-size: 13px; margin-top: 12px; color: #4a9eff;")
-        token_layout.addWidget(account_info_label)
+        self.account_info_label = QLabel("👤 Account Information")
+        self.account_info_label.setStyleSheet("font-weight: bold; font-size: 13px; margin-top: 12px; color: #4a9eff;")
+        token_layout.addWidget(self.account_info_label)
 
         # Username
         username_row = QHBoxLayout()
@@ -706,7 +744,14 @@ class StreamApp(QMainWindow):
         )
         if reply == QMessageBox.Yes:
             self.token_entry.clear()
+            if self.stream is not None:
+                self.stream.close()  # Stops the keepalive sending the cleared token
             self.stream = None
+            self._account_generation += 1
+            self._account_snapshot = {}
+            self._account_info_stale = False
+            self.set_account_info_stale(False)
+            self.status_poller.stop()
             self.tiktok_username.clear()
             self.app_status.clear()
             self.can_go_live.clear()
@@ -727,12 +772,82 @@ class StreamApp(QMainWindow):
             data = {}
         self.token_entry.setText(data.get("token", ""))
         self.stream_title.setText(data.get("title", ""))
+        # Restoring the saved game must not pop up the suggestions list
+        self.game_category.blockSignals(True)
         self.game_category.setText(data.get("game", ""))
+        self.game_category.blockSignals(False)
         self.mature_checkbox.setChecked(data.get("audience_type", "0") == "1")
         self.suppress_donation_reminder = data.get("suppress_donation_reminder", False)
-
+        self.search_debouncer.debounce = data.get("search_debounce_ms", 250) / 1000.0
+        self.token_search_roots = data.get("token_search_roots", [])
+        self.watch_token_checkbox.setChecked(data.get("watch_local_token", False))
+        # Opt-in: a directory here keeps one logged-in Chrome profile per account;
+        # empty = throwaway profile, login every time
+        self.browser_profile_dir = data.get("browser_profile_dir", "")
+        self.keep_browser_warm = data.get("keep_browser_warm", False)
+        # "cdp" (DevTools events) or "wire" (selenium-wire proxy, needs seleniumwire/ca.crt)
+        self.browser_capture = data.get("browser_capture", "cdp")
+        # {"enabled", "types", "deny_hosts", "allow_hosts"} for the login browser
+        # Off by default: the login is interactive and may need blocked resources
+        self.resource_blocking = data.get("resource_blocking", {"enabled": False})
+
+        # Show the last known account state at once, the refresh below replaces it
+        self.load_account_snapshot()
         self.refresh_account_info()
 
+    @staticmethod
+    def token_fingerprint(token):
+        return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+    def load_account_snapshot(self):
+        """Render the persisted getInfo result for the saved token, marked as stale"""
+        token = self.token_entry.text()
+        if not token:
+            return
+        try:
+            with open(ACCOUNT_SNAPSHOT_FILE, "r") as file:
+                data = json.load(file)
+        except:
+            return
+        if data.get("token") != self.token_fingerprint(token):
+            return  # Snapshot belongs to another account
+        if data.get("info"):
+            self.apply_account_info(data["info"], stale=True)
+        if data.get("game") and data.get("game") == self.game_category.text():
+            self.game_mask_id = data.get("game_mask_id", "")
+
+    def save_account_snapshot(self, info=None):
+        """Persist the latest account info and resolved category next to config.json"""
+        token = self.token_entry.text()
+        if not token:
+            return
+        if info is None:
+            try:
+                with open(ACCOUNT_SNAPSHOT_FILE, "r") as file:
+                    info = json.load(file).get("info", {})
+            except:
+                info = {}
+        data = {
+            "token": self.token_fingerprint(token),
+            "saved_at": time.time(),
+            "info": info,
+            "game": self.game_category.text(),
+            "game_mask_id": self.game_mask_id,
+        }
+        try:
+            with open(ACCOUNT_SNAPSHOT_FILE, "w") as file:
+                json.dump(data, file, indent=2)
+        except (IOError, OSError) as e:
+            print(f"Failed to save account snapshot: {e}")
+
+    def set_account_info_stale(self, stale):
+        if stale:
+            self.account_info_label.setText("👤 Account Information (cached, refreshing...)")
+            self.account_info_label.setStyleSheet("font-weight: bold; font-size: 13px; margin-top: 12px; color: #888888;")
+        else:
+            self.account_info_label.setText("👤 Account Information")
+            self.account_info_label.setStyleSheet("font-weight: bold; font-size: 13px; margin-top: 12px; color: #4a9eff;")
+
     def save_config(self, show_message=True):
         try:
             data = {
@@ -740,7 +855,14 @@ class StreamApp(QMainWindow):
                 "game": self.game_category.text(),
                 "audience_type": "1" if self.mature_checkbox.isChecked() else "0",
                 "token": self.token_entry.text(),
-                "suppress_donation_reminder": self.suppress_donation_reminder
+                "suppress_donation_reminder": self.suppress_donation_reminder,
+                "search_debounce_ms": int(self.search_debouncer.debounce * 1000),
+                "token_search_roots": self.token_search_roots,
+                "watch_local_token": self.watch_token_checkbox.isChecked(),
+                "browser_profile_dir": self.browser_profile_dir,
+                "keep_browser_warm": self.keep_browser_warm,
+                "browser_capture": self.browser_capture,
+                "resource_blocking": self.resource_blocking
             }
             with open("config.json", "w") as file:
                 json.dump(data, file, indent=2)
@@ -751,185 +873,303 @@ class StreamApp(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "❌ Error", f"Failed to save configuration: {str(e)}")
 
-    def load_account_info(self):
+    def spawn(self, coro):
+        """Schedule a coroutine on the Qt asyncio loop and keep a reference to it"""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            exc = task.exception()
+            print("".join(traceback.format_exception(type(exc), exc, exc.__traceback__)))
+
+    async def run_blocking(self, fn, *args):
+        """Await a blocking call (requests, file I/O, browser) on the worker pool.
+
+        Cancelling the awaiting task drops the call if it is still queued and
+        flags its CancellationToken if it is already running.
+        """
+        future = self.executor.submit(fn, *args)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            self.executor.cancel(future)
+            raise
+
+    def load_account_info(self, max_age=None):
+        """Refresh account info in the background for the current Stream.
+
+        max_age=0 (explicit Refresh) always asks the server; the default may
+        answer from the Stream's getInfo cache.
+        """
         if not self.stream:
             self.loading_progress.hide()
             return
-            
+
+        self._account_generation += 1
+        self.loading_progress.show()
+        self.spawn(self._load_account_info(self._account_generation, self.stream, max_age))
+
+    async def _load_account_info(self, generation, stream, max_age=None):
         try:
-            self.loading_progress.show()
-            info = self.stream.getInfo()
-            user = info.get("user", {})
-            self.tiktok_username.setText(user.get("username", "Unknown"))
-            
-            app_status = info.get("application_status", {})
-            status_text = app_status.get("status", "Unknown")
-            self.app_status.setText(status_text)
-            
-            can_go_live = info.get("can_be_live", False)
-            self.can_go_live.setText(str(can_go_live))
-            
-            # Update live status indicator - cache stylesheet strings
-            if can_go_live:
-                self.live_status_indicator.setStyleSheet("color: #00d4aa; font-size: 16px;")
-                self.can_go_live.setStyleSheet("color: #00d4aa;")
-            else:
-                self.live_status_indicator.setStyleSheet("color: #e74c3c; font-size: 16px;")
-                self.can_go_live.setStyleSheet("color: #e74c3c;")
-            
-            # Batch UI updates
-            enabled = can_go_live and bool(self.token_entry.text())
-            self.stream_title.setEnabled(can_go_live)
-            self.game_category.setEnabled(can_go_live)
-            self.mature_checkbox.setEnabled(can_go_live)
-            self.go_live_btn.setEnabled(enabled)
-            
+            info = await self.run_blocking(stream.getInfo, max_age)
+            if generation != self._account_generation:
+                return  # Stale result from an older token
             self.loading_progress.hide()
-
+            if stream.info_error is not None or not info:
+                # getInfo swallows request errors; keep what is on screen, marked stale
+                if info:
+                    self.apply_account_info(info, stale=True)
+                elif self._account_snapshot:
+                    self._account_info_stale = True
+                    self.set_account_info_stale(True)
+                else:
+                    self.show_message("Error", f"Failed to load account info: {stream.info_error or 'empty response'}", "error")
+                return
+            self.apply_account_info(info)
         except Exception as e:
+            if generation != self._account_generation:
+                return
             self.loading_progress.hide()
             self.live_status_indicator.setStyleSheet("color: #e74c3c; font-size: 16px;")
-            QMessageBox.critical(self, "Error", f"Failed to load account info: {str(e)}")
+            self._account_snapshot.pop("can_be_live", None)  # Repaint on the next success
+            self.show_message("Error", f"Failed to load account info: {str(e)}", "error")
+
+    def apply_account_info(self, info, stale=False):
+        """Render a getInfo payload, touching only widgets whose field changed"""
+        if stale != self._account_info_stale:
+            self._account_info_stale = stale
+            self.set_account_info_stale(stale)
+        if info and not stale:
+            self.save_account_snapshot(info)
+        snapshot = account_snapshot(info)
+        changed = diff_snapshot(self._account_snapshot, snapshot)
+        self._account_snapshot = snapshot
+
+        if "username" in changed:
+            self.tiktok_username.setText(snapshot["username"])
+        if "status" in changed:
+            self.app_status.setText(snapshot["status"])
+        if "can_be_live" not in changed:
+            return
+
+        can_go_live = snapshot["can_be_live"]
+        self.can_go_live.setText(str(can_go_live))
+        
+        # Update live status indicator - cache stylesheet strings
+        if can_go_live:
+            self.live_status_indicator.setStyleSheet("color: #00d4aa; font-size: 16px;")
+            self.can_go_live.setStyleSheet("color: #00d4aa;")
+        else:
+            self.live_status_indicator.setStyleSheet("color: #e74c3c; font-size: 16px;")
+            self.can_go_live.setStyleSheet("color: #e74c3c;")
+        
+        # Batch UI updates; Go Live stays disabled while a stream is running
+        enabled = can_go_live and bool(self.token_entry.text()) and not self.end_live_btn.isEnabled()
+        self.stream_title.setEnabled(can_go_live)
+        self.game_category.setEnabled(can_go_live)
+        self.mature_checkbox.setEnabled(can_go_live)
+        self.go_live_btn.setEnabled(enabled)
+
+    async def poll_account_info(self):
+        """Fetch fresh account info for the live status poller"""
+        stream = self.stream
+        if stream is None:
+            raise RuntimeError("no token loaded")
+        info = await self.run_blocking(stream.getInfo, 0)
+        if stream.info_error is not None:
+            raise stream.info_error
+        return info
+
+    def handle_polled_account_info(self, info):
+        if self.stream is not None:
+            self.apply_account_info(info)
     
+    def ensure_stream(self, token):
+        """Reuse the Stream object unless the token has changed"""
+        if self.stream is None or self.stream.token != token:
+            if self.stream is not None:
+                self.stream.close()
+            self.stream = Stream(token)
+            stream = self.stream
+            # Background getInfo revalidations report changes through a signal
+            stream.add_info_listener(lambda info: self.account_info_changed.emit(stream, info))
+            # Pay DNS/TCP/TLS now instead of on the first Go Live click
+            self.executor.submit(self.stream.prewarm)
+            self.status_poller.stop()
+            self.status_poller.start()
+
+    def handle_account_info_changed(self, stream, info):
+        """Apply getInfo data that changed during a background revalidation"""
+        if stream is self.stream:
+            self.apply_account_info(info)
+
     def refresh_account_info(self):
         token = self.token_entry.text()
         if token:
-            # Reuse Stream object if token hasn't changed
-            if self.stream is None or not hasattr(self.stream, 's') or \
-               self.stream.s.headers.get('authorization') != f"Bearer {token}":
-                self.stream = Stream(token)
-            self.load_account_info()
+            self.ensure_stream(token)
+            # User-initiated: bypass the getInfo cache
+            self.load_account_info(max_age=0)
             self.fetch_game_mask_id(self.game_category.text())
         self.save_config(False)
 
     def load_local_token(self):
-        self.enable_button.emit("load_local", False)
-        self.update_loading.emit(True)
-        
-        def load_token_thread():
-            try:
-                # Determine the correct path based on the operating system
-                if platform.system() == 'Windows':
-                    path_pattern = os.path.expandvars(r'%appdata%\slobs-client\Local Storage\leveldb\*.log')
-                elif platform.system() == 'Darwin':  # macOS
-                    path_pattern = os.path.expanduser('~/Library/Application Support/slobs-client/Local Storage/leveldb/*.log')
-                else:
-                    self.show_message.emit("Error", "Unsupported operating system for local token retrieval.", "error")
-                    self.enable_button.emit("load_local", True)
-                    self.update_loading.emit(False)
-                    return
-
-                # Get all files matching the pattern
-                files = glob.glob(path_pattern)
-                
-                if not files:
-                    self.show_message.emit("Error", "No Streamlabs log files found. Make sure Streamlabs is installed and you're logged in using TikTok.", "error")
-                    self.enable_button.emit("load_local", True)
-                    self.update_loading.emit(False)
-                    return
-                
-                # Sort files by date modified, newest first (most likely to have current token)
-                files.sort(key=os.path.getmtime, reverse=True)
-                
-                # Compile regex pattern once (cached for performance)
-                token_pattern = re.compile(r'"apiToken":"([a-f0-9]+)"', re.IGNORECASE)
-                
-                token = None
-                
-                # Loop through files and search for the token pattern
-                # Limit to first 10 files for performance (newest files are checked first)
-                for file in files[:10]:
-                    try:
-                        # Use binary mode and decode for better performance on large files
-                        with open(file, 'rb') as f:
-                            content = f.read().decode('utf-8', errors='ignore')
-                            matches = token_pattern.findall(content)
-                            if matches:
-                                # Get the last occurrence of the token (most recent)
-                                token = matches[-1]
-                                break
-                    except (IOError, OSError, UnicodeDecodeError):
-                        continue  # Silently continue to next file
-                
-                if token:
-                    self.token_loaded.emit(token)
-                    self.show_message.emit("Success", "Token loaded successfully!", "success")
-                else:
-                    self.show_message.emit("Error", "No API Token found locally. Make sure Streamlabs is installed and you're logged in using TikTok.", "error")
-            except Exception as e:
-                self.show_message.emit("Error", f"Failed to load token: {str(e)}", "error")
-            finally:
-                self.enable_button.emit("load_local", True)
-                self.update_loading.emit(False)
-        
-        threading.Thread(target=load_token_thread, daemon=True).start()
+        self.spawn(self._load_local_token())
 
+    async def _load_local_token(self):
+        self.load_local_btn.setEnabled(False)
+        self.set_loading(True)
+        try:
+            token = await self.run_blocking(find_local_token, STATE_FILE, self.token_search_roots, self.token_validator)
+            if token:
+                self.handle_token_loaded(token)
+                self.show_message("Success", "Token loaded successfully!", "success")
+            else:
+                self.show_message("Error", "No API Token found locally. Make sure Streamlabs is installed and you're logged in using TikTok.", "error")
+        except LocalTokenError as e:
+            self.show_message("Error", str(e), "error")
+        except Exception as e:
+            self.show_message("Error", f"Failed to load token: {str(e)}", "error")
+        finally:
+            self.load_local_btn.setEnabled(True)
+            self.set_loading(False)
+
+    def set_token_watch(self, enabled):
+        if enabled and self.token_watcher is None:
+            # Runs on a watcher thread, the signal hands the token to the GUI thread
+            self.token_watcher = TokenWatcher(self.token_loaded.emit, self.token_search_roots)
+            self.token_watcher.start()
+        elif not enabled and self.token_watcher is not None:
+            self.token_watcher.stop()
+            self.token_watcher = None
 
     def fetch_online_token(self):
-        self.enable_button.emit("load_online", False)
-        self.update_loading.emit(True)
-        
-        def fetch_token_thread():
-            try:
-                # Lazy import TokenRetriever - only load when needed (heavy seleniumbase dependency)
-                from token_retriever import TokenRetriever
-                retriever = TokenRetriever()
-                binary_path = None
-                if hasattr(self, "binary_location_entry"):
-                    binary_path = self.binary_location_entry.text().strip() or None
-                token = retriever.retrieve_token(binary_path)
-                
-                if token:
-                    self.token_loaded.emit(token)
-                    self.show_message.emit("Success", "Token retrieved successfully!", "success")
-                else:
-                    self.show_message.emit("Error", "Failed to obtain token online!", "error")
-            except Exception as e:
-                if "Chrome not found" in str(e):
-                    self.show_message.emit("Error", "Google Chrome not found. Please install it to use this feature.", "error")
-                else:
-                    self.show_message.emit("Error", f"Unexpected error: {e}", "error")
-                print(traceback.format_exc())
-            finally:
-                self.enable_button.emit("load_online", True)
-                self.update_loading.emit(False)
-        
-        threading.Thread(target=fetch_token_thread, daemon=True).start()
+        # With saved browser profiles, offer to reuse the shown account's login
+        account = None
+        username = self._account_snapshot.get("username")
+        if self.browser_profile_dir and username and username != "Unknown":
+            reply = QMessageBox.question(
+                self,
+                "Load from Web",
+                f"Log in again as {username}?\n\nChoose No to log in with a different account.",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.Yes
+            )
+            if reply == QMessageBox.Yes:
+                account = username
+        self.spawn(self._fetch_online_token(account))
+
+    async def _fetch_online_token(self, account=None):
+        self.load_online_btn.setEnabled(False)
+        self.set_loading(True)
+        binary_path = None
+        if hasattr(self, "binary_location_entry"):
+            binary_path = self.binary_location_entry.text().strip() or None
+        try:
+            # Lazy import TokenRetriever - only load when needed (heavy seleniumbase dependency)
+            from token_retriever import ResourcePolicy, TokenRetriever
+            if self.token_retriever is None:
+                self.token_retriever = TokenRetriever(
+                    profile_dir=self.browser_profile_dir or None,
+                    keep_alive=self.keep_browser_warm,
+                    capture=self.browser_capture,
+                    block=ResourcePolicy.from_config(self.resource_blocking)
+                )
+            retriever = self.token_retriever
+            token = await self.run_blocking(retriever.retrieve_token, binary_path, account)
+            
+            if token:
+                self.handle_token_loaded(token)
+                self.show_message("Success", "Token retrieved successfully!", "success")
+                if self.browser_profile_dir:
+                    # Name the new login's profile after the account it belongs to
+                    info = await self.run_blocking(self.stream.getInfo)
+                    username = account_snapshot(info)["username"]
+                    if username != "Unknown":
+                        await self.run_blocking(retriever.assign_profile, username)
+            else:
+                self.show_message("Error", "Failed to obtain token online!", "error")
+        except Exception as e:
+            if "Chrome not found" in str(e):
+                self.show_message("Error", "Google Chrome not found. Please install it to use this feature.", "error")
+            else:
+                self.show_message("Error", f"Unexpected error: {e}", "error")
+            print(traceback.format_exc())
+        finally:
+            self.load_online_btn.setEnabled(True)
+            self.set_loading(False)
 
     def fetch_game_mask_id(self, game_name):
+        # Answer from the resolver cache right away, then revalidate in the background
+        cached = self.category_resolver.cached(game_name)
+        if cached is not None:
+            self.game_mask_id = cached
         if self.stream:
-            try:
-                categories = self.stream.search(game_name)
-                for category in categories:
-                    if category['full_name'] == game_name:
-                        self.game_mask_id = category['game_mask_id']
-                        return
-                self.game_mask_id = ""
-            except Exception as e:
-                QMessageBox.warning(self, "Search Error", f"Failed to search games: {str(e)}")
+            self.spawn(self._fetch_game_mask_id(self._account_generation, game_name))
 
-    def handle_game_search(self, text):
-        if text and self.stream:
-            threading.Thread(target=self.search_games, args=(text,)).start()
-        else:
-            self.suggestions_list.hide()
-
-    def search_games(self, text):
+    async def _fetch_game_mask_id(self, generation, game_name):
         try:
-            categories = self.stream.search(text)
-            self.update_suggestions.emit(categories)
+            # Shielded: the Future is shared with every other caller of this name
+            game_mask_id = await asyncio.shield(asyncio.wrap_future(
+                self.category_resolver.resolve_async(self.stream, game_name)
+            ))
         except Exception as e:
-            QMessageBox.critical(self, "Search Error", f"Game search failed: {str(e)}")
+            print(f"Search error: {e}")
+            return
+        if generation != self._account_generation or game_name != self.game_category.text():
+            return  # Token or category changed while the lookup was running
+        if game_mask_id != self.game_mask_id:
+            self.game_mask_id = game_mask_id
+            self.save_account_snapshot()
 
-    def update_suggestions_list(self, categories):
+    def handle_game_search(self, text):
+        if not text:
+            self.search_debouncer.cancel()
+            self.suggestions_list.hide()
+            return
+        # Render what the catalog already knows, network results replace it later
+        local = self.catalog.suggest(text)
+        if local:
+            self.render_suggestions(local + [{"full_name": "Other", "game_mask_id": ""}])
+        if self.stream:
+            self.search_debouncer.submit(text)
+        else:
+            self.search_debouncer.cancel()
+            if not local:
+                self.suggestions_list.hide()
+
+    async def search_games(self, text):
+        return await self.run_blocking(self._search_and_merge, self.stream, text)
+
+    def _search_and_merge(self, stream, text):
+        """Search on a worker thread and file the results in the catalog there too"""
+        categories = stream.search(text)
+        self.catalog.merge(categories)
+        return categories
+
+    def update_suggestions_list(self, query, categories):
+        if query != self.game_category.text():
+            return  # Superseded by a newer keystroke
+        self.render_suggestions(categories)
+        self.search_debouncer.record_render(query)
+
+    def render_suggestions(self, categories):
         self.suggestions_list.clear()
         for category in categories:
             self.suggestions_list.addItem(QListWidgetItem(category['full_name']))
         self.suggestions_list.setVisible(bool(categories))
 
     def handle_suggestion_selected(self, item):
-        self.game_category.setText(item.text())
-        self.fetch_game_mask_id(item.text())
+        name = item.text()
+        # Without this, textChanged re-renders the list and deletes item mid-slot
+        self.game_category.blockSignals(True)
+        self.game_category.setText(name)
+        self.game_category.blockSignals(False)
+        self.search_debouncer.cancel()
+        self.fetch_game_mask_id(name)
         self.suggestions_list.hide()
 
     def start_stream(self):
@@ -937,37 +1177,64 @@ class StreamApp(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please enter a stream title before going live.")
             return
         
-        self.enable_button.emit("go_live", False)
-        self.set_button_text.emit("go_live", "⏳ Starting...")
-        self.update_loading.emit(True)
-        
-        def start_stream_thread():
-            try:
-                audience_type = "1" if self.mature_checkbox.isChecked() else "0"
-                stream_url, stream_key = self.stream.start(
-                    self.stream_title.text(),
-                    self.game_mask_id,
-                    audience_type
-                )
-                
-                if stream_url and stream_key:
-                    self.set_stream_info.emit(stream_url, stream_key)
-                    self.enable_button.emit("end_live", True)
-                    self.enable_button.emit("go_live", False)
-                    self.set_button_text.emit("go_live", "▶️ Go Live")
-                    self.show_message.emit("✅ Live Started", "Stream started successfully!\n\nYour stream URL and key are ready to use in OBS Studio.", "success")
-                else:
-                    self.enable_button.emit("go_live", True)
-                    self.set_button_text.emit("go_live", "▶️ Go Live")
-                    self.show_message.emit("❌ Error", "Failed to start stream! Please check your connection and try again.", "error")
-            except Exception as e:
-                self.enable_button.emit("go_live", True)
-                self.set_button_text.emit("go_live", "▶️ Go Live")
-                self.show_message.emit("❌ Error", f"Failed to start stream: {str(e)}", "error")
-            finally:
-                self.update_loading.emit(False)
-        
-        threading.Thread(target=start_stream_thread, daemon=True).start()
+        self.go_live_btn.setEnabled(False)
+        self.go_live_btn.setText("⏳ Starting...")
+        self.set_loading(True)
+
+        stream = self.stream
+        game_name = self.game_category.text()
+        # Kick off resolution now so a cache miss overlaps with task start-up
+        if self.category_resolver.cached(game_name) is None:
+            self.category_resolver.resolve_async(stream, game_name)
+        self.spawn(self._start_stream(
+            stream,
+            self.stream_title.text(),
+            game_name,
+            "1" if self.mature_checkbox.isChecked() else "0"
+        ))
+
+    async def _start_stream(self, stream, title, game_name, audience_type):
+        try:
+            # Cache hit returns at once; a miss only joins the in-flight search
+            game_mask_id = self.category_resolver.cached(game_name)
+            if game_mask_id is None:
+                try:
+                    # Shielded so the timeout does not cancel the search other callers share
+                    game_mask_id = await asyncio.wait_for(
+                        asyncio.shield(asyncio.wrap_future(self.category_resolver.resolve_async(stream, game_name))),
+                        stream.default_timeout
+                    )
+                except Exception as e:
+                    print(f"Category resolve error: {e}")
+                    game_mask_id = ""
+            else:
+                self.category_resolver.resolve_async(stream, game_name)  # Revalidate
+            stream_url, stream_key = await self.run_blocking(
+                stream.start,
+                title,
+                game_mask_id,
+                audience_type
+            )
+            
+            if stream_url and stream_key:
+                self.stream_url.setText(stream_url)
+                self.stream_key.setText(stream_key)
+                self.stream_key.setEchoMode(QLineEdit.Password)  # Keep key hidden
+                self.end_live_btn.setEnabled(True)
+                self.go_live_btn.setEnabled(False)
+                self.go_live_btn.setText("▶️ Go Live")
+                self.status_poller.burst()
+                self.show_message("✅ Live Started", "Stream started successfully!\n\nYour stream URL and key are ready to use in OBS Studio.", "success")
+            else:
+                self.go_live_btn.setEnabled(True)
+                self.go_live_btn.setText("▶️ Go Live")
+                self.show_message("❌ Error", "Failed to start stream! Please check your connection and try again.", "error")
+        except Exception as e:
+            self.go_live_btn.setEnabled(True)
+            self.go_live_btn.setText("▶️ Go Live")
+            self.show_message("❌ Error", f"Failed to start stream: {str(e)}", "error")
+        finally:
+            self.set_loading(False)
 
     def end_stream(self):
         reply = QMessageBox.question(
@@ -981,30 +1248,31 @@ class StreamApp(QMainWindow):
         if reply != QMessageBox.Yes:
             return
         
-        self.enable_button.emit("end_live", False)
-        self.set_button_text.emit("end_live", "⏳ Ending...")
-        self.update_loading.emit(True)
-        
-        def end_stream_thread():
-            try:
-                if self.stream.end():
-                    self.clear_stream_info.emit()
-                    self.enable_button.emit("end_live", False)
-                    self.set_button_text.emit("end_live", "⏹️ End Live")
-                    self.enable_button.emit("go_live", True)
-                    self.show_message.emit("✅ Live Ended", "Stream ended successfully!", "success")
-                else:
-                    self.enable_button.emit("end_live", True)
-                    self.set_button_text.emit("end_live", "⏹️ End Live")
-                    self.show_message.emit("❌ Error", "Failed to end stream! Please try again.", "error")
-            except Exception as e:
-                self.enable_button.emit("end_live", True)
-                self.set_button_text.emit("end_live", "⏹️ End Live")
-                self.show_message.emit("❌ Error", f"Failed to end stream: {str(e)}", "error")
-            finally:
-                self.update_loading.emit(False)
-        
-        threading.Thread(target=end_stream_thread, daemon=True).start()
+        self.end_live_btn.setEnabled(False)
+        self.end_live_btn.setText("⏳ Ending...")
+        self.set_loading(True)
+        self.spawn(self._end_stream(self.stream))
+
+    async def _end_stream(self, stream):
+        try:
+            if await self.run_blocking(stream.end):
+                self.stream_url.clear()
+                self.stream_key.clear()
+                self.end_live_btn.setEnabled(False)
+                self.end_live_btn.setText("⏹️ End Live")
+                self.go_live_btn.setEnabled(True)
+                self.status_poller.burst()
+                self.show_message("✅ Live Ended", "Stream ended successfully!", "success")
+            else:
+                self.end_live_btn.setEnabled(True)
+                self.end_live_btn.setText("⏹️ End Live")
+                self.show_message("❌ Error", "Failed to end stream! Please try again.", "error")
+        except Exception as e:
+            self.end_live_btn.setEnabled(True)
+            self.end_live_btn.setText("⏹️ End Live")
+            self.show_message("❌ Error", f"Failed to end stream: {str(e)}", "error")
+        finally:
+            self.set_loading(False)
 
     def copy_to_clipboard(self, widget):
         text = widget.text()
@@ -1086,21 +1354,20 @@ class StreamApp(QMainWindow):
     def open_live_monitor(self):
         QDesktopServices.openUrl("https://livecenter.tiktok.com/live_monitor?lang=en-US")
 
-    def handle_ui_update(self):
-        self.load_account_info()
-    
     def handle_token_loaded(self, token):
-        """Thread-safe handler for token loading"""
+        """Apply a newly loaded token and refresh the account panel"""
         self.token_entry.setText(token)
         # Create Stream object only once
-        if self.stream is None or not hasattr(self.stream, 's') or \
-           self.stream.s.headers.get('authorization') != f"Bearer {token}":
-            self.stream = Stream(token)
+        self.ensure_stream(token)
         self.load_account_info()
         self.fetch_game_mask_id(self.game_category.text())
     
+    def show_message(self, title, message, msg_type):
+        """Show a message box once the current coroutine step has finished"""
+        # Deferred so the modal loop never runs inside an asyncio task step
+        QTimer.singleShot(0, lambda: self.handle_show_message(title, message, msg_type))
+
     def handle_show_message(self, title, message, msg_type):
-        """Thread-safe handler for showing messages"""
         if msg_type == "info":
             QMessageBox.information(self, title, message)
         elif msg_type == "error":
@@ -1108,41 +1375,26 @@ class StreamApp(QMainWindow):
         elif msg_type == "success":
             QMessageBox.information(self, title, message)
     
-    def handle_update_loading(self, show):
-        """Thread-safe handler for loading indicator"""
+    def set_loading(self, show):
         if show:
             self.loading_progress.show()
         else:
             self.loading_progress.hide()
-    
-    def handle_enable_button(self, button_name, enabled):
-        """Thread-safe handler for enabling/disabling buttons"""
-        if button_name == "load_local":
-            self.load_local_btn.setEnabled(enabled)
-        elif button_name == "load_online":
-            self.load_online_btn.setEnabled(enabled)
-        elif button_name == "go_live":
-            self.go_live_btn.setEnabled(enabled)
-        elif button_name == "end_live":
-            self.end_live_btn.setEnabled(enabled)
-    
-    def handle_set_button_text(self, button_name, text):
-        """Thread-safe handler for setting button text"""
-        if button_name == "go_live":
-            self.go_live_btn.setText(text)
-        elif button_name == "end_live":
-            self.end_live_btn.setText(text)
-    
-    def handle_set_stream_info(self, url, key):
-        """Thread-safe handler for setting stream URL and key"""
-        self.stream_url.setText(url)
-        self.stream_key.setText(key)
-        self.stream_key.setEchoMode(QLineEdit.Password)  # Keep key hidden
-    
-    def handle_clear_stream_info(self):
-        """Thread-safe handler for clearing stream URL and key"""
-        self.stream_url.clear()
-        self.stream_key.clear()
+
+    def closeEvent(self, event):
+        for task in list(self._tasks):
+            task.cancel()
+        self.search_debouncer.cancel()
+        self.status_poller.stop()
+        self.set_token_watch(False)
+        if self.stream is not None:
+            self.stream.close()
+        if self.token_retriever is not None:
+            self.token_retriever.close()
+        self.category_resolver.shutdown()
+        if not self.executor.shutdown(deadline=2.0):
+            print("Worker pool did not stop before the deadline; abandoning daemon workers")
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -1153,4 +1405,5 @@ if __name__ == "__main__":
     
     window = StreamApp()
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    # Qt-integrated asyncio loop: coroutines and widgets share the GUI thread
+    QtAsyncio.run(handle_sigint=True)
\ No newline at end of file
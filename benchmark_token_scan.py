@@ -0,0 +1,406 @@
+"""Benchmark the local token scan against synthetic slobs-client leveldb directories.
+
+    python benchmark_token_scan.py --sizes 64K,1M,64M --positions start,end
+    python benchmark_token_scan.py --sizes 1G --json results.json
+    python benchmark_token_scan.py --compare results.json --threshold 1.25
+
+Every case runs in a fresh process so peak RSS belongs to that scan alone.
+Extra scanners can be added with --scanner module:function, called as
+function(directory, state_file) and returning the token.
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+TOKEN = "0123456789abcdef" * 4
+STALE_TOKEN = "fedcba9876543210" * 4
+ORIGIN = b"_https://streamlabs.com\x00\x01"
+RECORD_SIZE = 4096
+LOG_BLOCK_SIZE = 32768
+TABLE_BLOCK_SIZE = 4096
+TABLE_MAGIC = 0xdb4775248b80fb57
+
+POSITIONS = ("start", "middle", "end", "none")
+FORMS = ("log", "compacted")
+
+
+# -- Synthetic LevelDB writer ------------------------------------------------
+
+def varint(n):
+    out = bytearray()
+    while True:
+        byte = n & 0x7f
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def local_storage_value(token, filler):
+    """A Local Storage value as Chromium writes it (0x01 = Latin-1 string)"""
+    body = {"filler": filler}
+    if token:
+        body = {"apiToken": token, "platform": "tiktok", "filler": filler}
+    return b"\x01" + json.dumps(body, separators=(",", ":")).encode()
+
+
+class LogWriter:
+    """Streams write batches into a LevelDB log file, fragmenting at block edges"""
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.offset = 0
+
+    def put(self, sequence, key, value):
+        record = struct.pack("<QI", sequence, 1) + b"\x01" + varint(len(key)) + key + varint(len(value)) + value
+        first = True
+        while True:
+            left = LOG_BLOCK_SIZE - self.offset % LOG_BLOCK_SIZE
+            if left < 7:
+                self._write(b"\x00" * left)
+                continue
+            fragment, record = record[:left - 7], record[left - 7:]
+            last = not record
+            kind = 1 if first and last else 2 if first else 4 if last else 3
+            self._write(b"\x00\x00\x00\x00" + struct.pack("<HB", len(fragment), kind) + fragment)
+            first = False
+            if last:
+                return
+
+    def _write(self, data):
+        self.file.write(data)
+        self.offset += len(data)
+
+    def close(self):
+        self.file.close()
+
+
+class TableWriter:
+    """Streams sorted entries into an uncompressed LevelDB SSTable"""
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.offset = 0
+        self.block = bytearray()
+        self.last_key = None
+        self.index = []
+
+    def put(self, sequence, key, value):
+        internal_key = key + struct.pack("<Q", (sequence << 8) | 1)
+        self.block += varint(0) + varint(len(internal_key)) + varint(len(value)) + internal_key + value
+        self.last_key = internal_key
+        if len(self.block) >= TABLE_BLOCK_SIZE:
+            self._flush()
+
+    def _write_block(self, entries_data):
+        data = bytes(entries_data) + struct.pack("<II", 0, 1)
+        handle = varint(self.offset) + varint(len(data))
+        self.file.write(data + b"\x00" + b"\x00" * 4)  # No compression, unchecked CRC
+        self.offset += len(data) + 5
+        return handle
+
+    def _flush(self):
+        if self.block:
+            self.index.append((self.last_key, self._write_block(self.block)))
+            self.block = bytearray()
+
+    def close(self):
+        self._flush()
+        meta_handle = self._write_block(b"")
+        index = bytearray()
+        for key, handle in self.index:
+            index += varint(0) + varint(len(key)) + varint(len(handle)) + key + handle
+        footer = meta_handle + self._write_block(index)
+        self.file.write(footer + b"\x00" * (40 - len(footer)) + struct.pack("<Q", TABLE_MAGIC))
+        self.file.close()
+
+
+def parse_size(text):
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def generate(directory, size, position, form, seed=0):
+    """Create a leveldb dir of about size bytes with the token at position"""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    count = max(1, size // RECORD_SIZE)
+    token_at = {"start": 0, "middle": count // 2, "end": count - 1}.get(position)
+    filler = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz ") for _ in range(RECORD_SIZE - 80))
+
+    def records():
+        # Keys sort in write order, so position holds in the log and the table alike
+        for i in range(count):
+            key = ORIGIN + b"key%010d" % i
+            if i == token_at:
+                yield key, local_storage_value(TOKEN, filler[:64])
+            elif i == 0 and token_at is not None:
+                # An older, stale token that the scanner must not prefer
+                yield key, local_storage_value(STALE_TOKEN, filler[:64])
+            else:
+                yield key, local_storage_value(None, filler)
+
+    if form == "log":
+        writer = LogWriter(os.path.join(directory, "000003.log"))
+    else:
+        writer = TableWriter(os.path.join(directory, "000005.ldb"))
+    for sequence, (key, value) in enumerate(records(), 1):
+        writer.put(sequence, key, value)
+    writer.close()
+    if form != "log":
+        # A compacted database still has a small, token-free current log
+        writer = LogWriter(os.path.join(directory, "000007.log"))
+        writer.put(count + 1, ORIGIN + b"recent", local_storage_value(None, filler[:64]))
+        writer.close()
+    with open(os.path.join(directory, "CURRENT"), "w") as file:
+        file.write("MANIFEST-000001\n")
+
+
+def dataset(workdir, size, position, form):
+    """Return the directory for a case, generating it on first use"""
+    directory = os.path.join(workdir, f"{form}-{position}-{size}", "slobs-client", "Local Storage", "leveldb")
+    marker = os.path.join(directory, ".complete")
+    if not os.path.exists(marker):
+        generate(directory, size, position, form)
+        open(marker, "w").close()
+    return directory
+
+
+# -- Scanners ------------------------------------------------------------------
+
+def scan_legacy(directory, state_file):
+    """The scan local_token replaced: read, decode and findall the 10 newest logs"""
+    import glob
+    import re
+    files = glob.glob(os.path.join(glob.escape(directory), "*.log"))
+    files.sort(key=os.path.getmtime, reverse=True)
+    token_pattern = re.compile(r'"apiToken":"([a-f0-9]+)"', re.IGNORECASE)
+    for file in files[:10]:
+        with open(file, "rb") as f:
+            matches = token_pattern.findall(f.read().decode("utf-8", errors="ignore"))
+        if matches:
+            return matches[-1]
+    return None
+
+
+def scan_cold(directory, state_file):
+    from local_token import find_local_token
+    return find_local_token(state_file, [directory])
+
+
+def scan_warm(directory, state_file):
+    """Second scan of unchanged files: the incremental state should make it free"""
+    from local_token import find_local_token
+    return find_local_token(state_file, [directory])
+
+
+def scan_collect(directory, state_file):
+    """Collect every candidate, as the validated Load from PC path does"""
+    from local_token import find_local_token
+    return find_local_token(state_file, [directory], lambda candidates: candidates[0])
+
+
+def scan_leveldb_index(directory, state_file):
+    from local_token import TokenScanState, leveldb_tokens
+    tokens = leveldb_tokens(directory, TokenScanState(None))
+    return tokens[0] if tokens else None
+
+
+SCANNERS = {
+    "legacy": scan_legacy,
+    "cold": scan_cold,
+    "warm": scan_warm,
+    "collect": scan_collect,
+    "leveldb_index": scan_leveldb_index,
+}
+# Scanners measured after a priming run that fills the state file
+PRIMED = {"warm"}
+# Scanners that never read SSTables, so compacted cases are skipped for them
+LOG_ONLY = {"legacy"}
+
+
+def load_scanner(spec):
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+# -- Measurement -------------------------------------------------------------
+
+def io_counters():
+    """(bytes through read() syscalls, bytes fetched from storage) for this process.
+
+    mmap reads skip read(), so only the storage counter sees them; it is
+    meaningful with --cold-cache, when the dataset is not in the page cache.
+    """
+    counters = {}
+    try:
+        with open("/proc/self/io") as file:
+            for line in file:
+                name, _, value = line.partition(":")
+                counters[name] = int(value)
+    except (OSError, ValueError):
+        pass
+    return counters.get("rchar"), counters.get("read_bytes")
+
+
+def peak_rss():
+    if not RESOURCE_AVAILABLE:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def drop_cache(directory):
+    """Ask the kernel to evict the dataset from the page cache (Linux only)"""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def run_case(scanner_spec, directory, primed, cold_cache, results):
+    # Keep discovery away from any real Streamlabs install on this machine
+    sandbox = tempfile.mkdtemp(prefix="tokenbench-home-")
+    for var in ("HOME", "APPDATA", "XDG_CONFIG_HOME", "WINEPREFIX"):
+        os.environ[var] = sandbox
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    scanner = SCANNERS.get(scanner_spec) or load_scanner(scanner_spec)
+    state_file = os.path.join(sandbox, "token_scan_state.json")
+    if primed:
+        scanner(directory, state_file)
+    if cold_cache:
+        drop_cache(directory)
+    rss_before = peak_rss()
+    read_before, disk_before = io_counters()
+    started = time.perf_counter()
+    try:
+        token, error = scanner(directory, state_file), None
+    except Exception as e:
+        token, error = None, f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - started
+    read_after, disk_after = io_counters()
+    results.put({
+        "wall_ms": elapsed * 1000,
+        "peak_rss": peak_rss(),
+        "baseline_rss": rss_before,
+        "bytes_read": read_after - read_before if read_before is not None else None,
+        "disk_read": disk_after - disk_before if disk_before is not None else None,
+        "token": token,
+        "error": error,
+    })
+
+
+def measure(scanner_spec, directory, primed, cold_cache):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=run_case, args=(scanner_spec, directory, primed, cold_cache, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def expected_token(position):
+    return None if position == "none" else TOKEN
+
+
+def human(n):
+    if n is None:
+        return "-"
+    for unit in ("B", "K", "M", "G"):
+        if abs(n) < 1024 or unit == "G":
+            return f"{n:.0f}{unit}" if unit == "B" else f"{n:.1f}{unit}"
+        n /= 1024
+
+
+def compare(results, baseline_path, threshold):
+    """Return the cases whose wall time or peak RSS grew past threshold x baseline"""
+    with open(baseline_path) as file:
+        baseline = {case["case"]: case for case in json.load(file)}
+    regressions = []
+    for case in results:
+        old = baseline.get(case["case"])
+        if old is None:
+            continue
+        for metric in ("wall_ms", "peak_rss"):
+            if old.get(metric) and case.get(metric) and case[metric] > old[metric] * threshold:
+                regressions.append(f"{case['case']}: {metric} {old[metric]:.0f} -> {case[metric]:.0f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Streamlabs local token scan")
+    parser.add_argument("--sizes", default="64K,1M,16M", help="comma-separated dataset sizes, e.g. 64K,1M,1G")
+    parser.add_argument("--positions", default=",".join(POSITIONS))
+    parser.add_argument("--forms", default=",".join(FORMS))
+    parser.add_argument("--scanners", default=",".join(SCANNERS))
+    parser.add_argument("--scanner", action="append", default=[], help="extra scanner as module:function")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "tokenbench"),
+                        help="generated datasets are kept here and reused")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the fastest is reported")
+    parser.add_argument("--cold-cache", action="store_true", help="evict datasets from the page cache before each run")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline results to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    scanners = [name for name in args.scanners.split(",") if name] + args.scanner
+    results = []
+    print(f"{'case':<40} {'wall':>10} {'peak rss':>10} {'read':>10} {'disk':>10}  token")
+    for size in (parse_size(s) for s in args.sizes.split(",")):
+        for form in args.forms.split(","):
+            for position in args.positions.split(","):
+                directory = dataset(args.workdir, size, position, form)
+                for scanner in scanners:
+                    if form != "log" and scanner in LOG_ONLY:
+                        continue
+                    runs = [measure(scanner, directory, scanner in PRIMED, args.cold_cache) for _ in range(args.repeat)]
+                    best = min(runs, key=lambda run: run["wall_ms"])
+                    case = f"{scanner}/{form}/{position}/{human(size)}"
+                    ok = best["token"] == expected_token(position) and not best["error"]
+                    results.append(dict(best, case=case, ok=ok))
+                    status = "ok" if ok else f"WRONG ({best['error'] or best['token']})"
+                    print(f"{case:<40} {best['wall_ms']:>8.1f}ms {human(best['peak_rss']):>10} "
+                          f"{human(best['bytes_read']):>10} {human(best['disk_read']):>10}  {status}")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+    failed = [case["case"] for case in results if not case["ok"]]
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        failed += regressions
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import sqlite3
+import threading
+import time
+
+
+class CategoryCatalog:
+    """Local SQLite catalog of every category seen from the search API.
+
+    Keyed by full_name and holding game_mask_id, so suggestions and mask id
+    lookups can be answered at startup before any network request finishes.
+    Uses an FTS5 index when the bundled SQLite supports it, LIKE otherwise.
+    """
+
+    def __init__(self, path="categories.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self.fts = False
+        try:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS categories ("
+                "full_name TEXT PRIMARY KEY, game_mask_id TEXT NOT NULL, seen_at REAL NOT NULL)"
+            )
+            try:
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS categories_fts USING fts5("
+                    "full_name, content='categories', content_rowid='rowid')"
+                )
+                self._conn.executescript("""
+                    CREATE TRIGGER IF NOT EXISTS categories_ai AFTER INSERT ON categories BEGIN
+                        INSERT INTO categories_fts(rowid, full_name) VALUES (new.rowid, new.full_name);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS categories_ad AFTER DELETE ON categories BEGIN
+                        INSERT INTO categories_fts(categories_fts, rowid, full_name)
+                        VALUES ('delete', old.rowid, old.full_name);
+                    END;
+                """)
+                self.fts = True
+            except sqlite3.OperationalError:
+                pass  # SQLite built without FTS5, fall back to LIKE
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Category catalog error: {e}")
+            self._conn = None
+
+    def merge(self, categories):
+        """Insert or update categories returned by Stream.search"""
+        if self._conn is None:
+            return
+        now = time.time()
+        rows = [
+            (c["full_name"], c["game_mask_id"], now)
+            for c in categories
+            if c.get("full_name") and c.get("game_mask_id")
+        ]
+        if not rows:
+            return
+        with self._lock:
+            try:
+                # Upsert keeps the rowid stable, so the FTS index needs no update
+                self._conn.executemany(
+                    "INSERT INTO categories(full_name, game_mask_id, seen_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(full_name) DO UPDATE SET "
+                    "game_mask_id=excluded.game_mask_id, seen_at=excluded.seen_at",
+                    rows,
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Category catalog error: {e}")
+
+    def lookup(self, full_name):
+        """Return the game_mask_id for an exact full_name, or None"""
+        if self._conn is None or not full_name:
+            return None
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT game_mask_id FROM categories WHERE full_name = ?", (full_name,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"Category catalog error: {e}")
+                return None
+        return row[0] if row else None
+
+    def suggest(self, text, limit=20):
+        """Return categories matching text in Stream.search format"""
+        if self._conn is None or not text:
+            return []
+        with self._lock:
+            try:
+                rows = self._query(text, limit)
+            except sqlite3.Error as e:
+                print(f"Category catalog error: {e}")
+                return []
+        return [{"full_name": name, "game_mask_id": mask_id} for name, mask_id in rows]
+
+    def _query(self, text, limit):
+        if self.fts:
+            # Every word must match as a prefix: "mine cr" -> "mine"* "cr"*
+            words = [w.replace('"', '""') for w in text.split()]
+            if words:
+                match = " ".join(f'"{w}"*' for w in words)
+                return self._conn.execute(
+                    "SELECT c.full_name, c.game_mask_id FROM categories_fts f "
+                    "JOIN categories c ON c.rowid = f.rowid "
+                    "WHERE categories_fts MATCH ? ORDER BY rank LIMIT ?",
+                    (match, limit),
+                ).fetchall()
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return self._conn.execute(
+            "SELECT full_name, game_mask_id FROM categories "
+            "WHERE full_name LIKE ? ESCAPE '\\' ORDER BY full_name LIMIT ?",
+            (pattern, limit),
+        ).fetchall()
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
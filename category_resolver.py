@@ -0,0 +1,81 @@
+import threading
+from concurrent.futures import Future
+
+from worker_pool import WorkerPool
+
+
+class CategoryResolver:
+    """Resolve category full_name -> game_mask_id without blocking on a search.
+
+    Answers come from the durable CategoryCatalog; misses and revalidations
+    run one search per name in the background, shared by every caller.
+    """
+
+    def __init__(self, catalog, executor=None):
+        self.catalog = catalog
+        self._inflight = {}  # name -> Future
+        self._lock = threading.Lock()
+        self._owns_executor = executor is None
+        self._executor = executor or WorkerPool(max_workers=2, name="CategoryResolver")
+
+    @staticmethod
+    def _is_blank(name):
+        return not name or name == "Other"
+
+    def cached(self, name):
+        """Return the cached game_mask_id, or None if the name was never seen"""
+        if self._is_blank(name):
+            return ""
+        return self.catalog.lookup(name)
+
+    def resolve_async(self, stream, name):
+        """Start (or join) a background search for name and return its Future"""
+        if self._is_blank(name) or stream is None:
+            future = Future()
+            future.set_result(self.cached(name) or "")
+            return future
+        with self._lock:
+            future = self._inflight.get(name)
+            started = future is None
+            if started:
+                future = self._executor.submit(self._resolve, stream, name)
+                self._inflight[name] = future
+        if started:
+            # Outside the lock: a task that already finished runs the callback
+            # right here, and _finished takes the lock itself
+            future.add_done_callback(lambda f, name=name: self._finished(name, f))
+        return future
+
+    def _finished(self, name, future):
+        with self._lock:
+            if self._inflight.get(name) is future:
+                del self._inflight[name]
+
+    def _resolve(self, stream, name):
+        categories = stream.search(name)
+        self.catalog.merge(categories)
+        for category in categories:
+            if category['full_name'] == name:
+                return category['game_mask_id']
+        return ""
+
+    def resolve(self, stream, name, timeout=None):
+        """Return the game_mask_id for name, revalidating in the background.
+
+        A cache hit returns immediately; a miss waits only on the search that
+        is (or is now) in flight for that name.
+        """
+        cached = self.cached(name)
+        if cached is not None:
+            if not self._is_blank(name):
+                self.resolve_async(stream, name)
+            return cached
+        try:
+            return self.resolve_async(stream, name).result(timeout)
+        except Exception as e:
+            print(f"Category resolve error: {e}")
+            return ""
+
+    def shutdown(self):
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
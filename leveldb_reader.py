@@ -0,0 +1,245 @@
+import glob
+import os
+import struct
+
+LOG_BLOCK_SIZE = 32768
+LOG_HEADER_SIZE = 7
+LOG_FULL, LOG_FIRST, LOG_MIDDLE, LOG_LAST = 1, 2, 3, 4
+
+TABLE_MAGIC = 0xdb4775248b80fb57
+FOOTER_SIZE = 48
+NO_COMPRESSION, SNAPPY_COMPRESSION = 0, 1
+
+TYPE_DELETION, TYPE_VALUE = 0, 1
+
+
+class LevelDBError(Exception):
+    pass
+
+
+def read_varint(data, pos):
+    """Decode a little-endian base-128 varint, returning (value, new_pos)"""
+    result = shift = 0
+    while True:
+        if pos >= len(data):
+            raise LevelDBError("truncated varint")
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+        if shift > 63:
+            raise LevelDBError("varint too long")
+
+
+def snappy_decompress(data):
+    """Decompress a raw snappy block (the format LevelDB uses per table block)"""
+    length, pos = read_varint(data, 0)
+    out = bytearray()
+    end = len(data)
+    while pos < end:
+        tag = data[pos]
+        pos += 1
+        kind = tag & 3
+        if kind == 0:  # Literal
+            size = tag >> 2
+            if size >= 60:
+                extra = size - 59
+                size = int.from_bytes(data[pos:pos + extra], "little")
+                pos += extra
+            size += 1
+            out += data[pos:pos + size]
+            pos += size
+            continue
+        if kind == 1:  # Copy, 1-byte offset
+            size = ((tag >> 2) & 7) + 4
+            offset = ((tag >> 5) << 8) | data[pos]
+            pos += 1
+        elif kind == 2:  # Copy, 2-byte offset
+            size = (tag >> 2) + 1
+            offset = int.from_bytes(data[pos:pos + 2], "little")
+            pos += 2
+        else:  # Copy, 4-byte offset
+            size = (tag >> 2) + 1
+            offset = int.from_bytes(data[pos:pos + 4], "little")
+            pos += 4
+        if offset == 0 or offset > len(out):
+            raise LevelDBError("bad snappy copy offset")
+        start = len(out) - offset
+        if offset >= size:
+            out += out[start:start + size]
+        else:
+            # Overlapping copy repeats the last `offset` bytes
+            for i in range(size):
+                out.append(out[start + i])
+    if len(out) != length:
+        raise LevelDBError("snappy length mismatch")
+    return bytes(out)
+
+
+def iter_log_records(data):
+    """Yield the logical records of a LevelDB log file, reassembling fragments"""
+    pending = None
+    pos = 0
+    size = len(data)
+    while pos + LOG_HEADER_SIZE <= size:
+        block_left = LOG_BLOCK_SIZE - pos % LOG_BLOCK_SIZE
+        if block_left < LOG_HEADER_SIZE:
+            pos += block_left  # Trailer padding
+            continue
+        length, kind = struct.unpack_from("<HB", data, pos + 4)
+        start = pos + LOG_HEADER_SIZE
+        pos = start + length
+        if kind == 0 or pos > size:
+            if kind == 0:
+                pos = start - LOG_HEADER_SIZE + block_left  # Zeroed rest of block
+            continue
+        fragment = data[start:pos]
+        if kind == LOG_FULL:
+            pending = None
+            yield fragment
+        elif kind == LOG_FIRST:
+            pending = bytearray(fragment)
+        elif kind == LOG_MIDDLE and pending is not None:
+            pending += fragment
+        elif kind == LOG_LAST and pending is not None:
+            pending += fragment
+            yield bytes(pending)
+            pending = None
+
+
+def iter_write_batch(record):
+    """Yield (sequence, type, key, value) for each operation in a write batch"""
+    if len(record) < 12:
+        return
+    sequence, count = struct.unpack_from("<QI", record, 0)
+    pos = 12
+    for i in range(count):
+        kind = record[pos]
+        pos += 1
+        key_len, pos = read_varint(record, pos)
+        key = record[pos:pos + key_len]
+        pos += key_len
+        value = b""
+        if kind == TYPE_VALUE:
+            value_len, pos = read_varint(record, pos)
+            value = record[pos:pos + value_len]
+            pos += value_len
+        elif kind != TYPE_DELETION:
+            raise LevelDBError("bad write batch entry")
+        yield sequence + i, kind, key, value
+
+
+def iter_block(block):
+    """Yield (key, value) pairs of an uncompressed table block"""
+    if len(block) < 4:
+        return
+    num_restarts = struct.unpack_from("<I", block, len(block) - 4)[0]
+    limit = len(block) - 4 - 4 * num_restarts
+    pos = 0
+    key = b""
+    while pos < limit:
+        shared, pos = read_varint(block, pos)
+        non_shared, pos = read_varint(block, pos)
+        value_len, pos = read_varint(block, pos)
+        key = key[:shared] + block[pos:pos + non_shared]
+        pos += non_shared
+        yield key, block[pos:pos + value_len]
+        pos += value_len
+
+
+def read_block(data, handle):
+    offset, size = handle
+    block = data[offset:offset + size]
+    compression = data[offset + size]
+    if compression == SNAPPY_COMPRESSION:
+        return snappy_decompress(block)
+    if compression != NO_COMPRESSION:
+        raise LevelDBError(f"unsupported block compression {compression}")
+    return block
+
+
+def iter_table(data):
+    """Yield (sequence, type, key, value) for every entry of an SSTable"""
+    if len(data) < FOOTER_SIZE:
+        raise LevelDBError("table too small")
+    footer = data[-FOOTER_SIZE:]
+    if struct.unpack_from("<Q", footer, FOOTER_SIZE - 8)[0] != TABLE_MAGIC:
+        raise LevelDBError("bad table magic")
+    pos = 0
+    _, pos = read_varint(footer, pos)  # Metaindex offset
+    _, pos = read_varint(footer, pos)  # Metaindex size
+    index_offset, pos = read_varint(footer, pos)
+    index_size, pos = read_varint(footer, pos)
+    index = read_block(data, (index_offset, index_size))
+    for _, handle in iter_block(index):
+        offset, hpos = read_varint(handle, 0)
+        size, _ = read_varint(handle, hpos)
+        for internal_key, value in iter_block(read_block(data, (offset, size))):
+            if len(internal_key) < 8:
+                continue
+            trailer = struct.unpack_from("<Q", internal_key, len(internal_key) - 8)[0]
+            yield trailer >> 8, trailer & 0xff, internal_key[:-8], value
+
+
+class LevelDB:
+    """Read-only view of a LevelDB directory, such as Chromium's Local Storage.
+
+    Parses the write-ahead logs (*.log) and SSTables (*.ldb / *.sst, snappy or
+    uncompressed) into an index of the newest value for every user key.
+    Lenient: checksums are not verified and damaged records are skipped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._index = None  # key -> (sequence, type, value)
+
+    def files(self):
+        patterns = ("*.log", "*.ldb", "*.sst")
+        return [f for pattern in patterns for f in glob.glob(os.path.join(self.path, pattern))]
+
+    def _entries(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if path.endswith(".log"):
+            for record in iter_log_records(data):
+                try:
+                    yield from iter_write_batch(record)
+                except (LevelDBError, IndexError, struct.error):
+                    continue  # Damaged batch
+        else:
+            yield from iter_table(data)
+
+    def build_index(self):
+        index = {}
+        for path in self.files():
+            try:
+                for sequence, kind, key, value in self._entries(path):
+                    current = index.get(key)
+                    if current is None or sequence > current[0]:
+                        index[key] = (sequence, kind, value)
+            except (IOError, OSError, LevelDBError, IndexError, struct.error) as e:
+                print(f"Skipping unreadable LevelDB file {os.path.basename(path)}: {e}")
+        self._index = index
+        return index
+
+    @property
+    def index(self):
+        if self._index is None:
+            self.build_index()
+        return self._index
+
+    def get(self, key):
+        """Return the live value for key, or None if missing or deleted"""
+        entry = self.index.get(key)
+        if entry is None or entry[1] != TYPE_VALUE:
+            return None
+        return entry[2]
+
+    def items_by_recency(self):
+        """Yield live (key, value) pairs, most recently written first"""
+        live = [(seq, key, value) for key, (seq, kind, value) in self.index.items() if kind == TYPE_VALUE]
+        live.sort(key=lambda item: item[0], reverse=True)
+        for _, key, value in live:
+            yield key, value
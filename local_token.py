@@ -0,0 +1,374 @@
+import glob
+import json
+import mmap
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from leveldb_reader import LevelDB
+from worker_pool import current_token
+
+# Searched backwards from the end of each file; the value is matched in place
+TOKEN_KEY = b'"apiToken":"'
+TOKEN_VALUE = re.compile(rb'([0-9a-fA-F]+)"')
+
+# Newest log files scanned per root, and scanner threads across all roots
+MAX_FILES_PER_ROOT = 10
+SCAN_WORKERS = 4
+
+# Distinct tokens remembered per file (stale ones linger after account switches)
+MAX_CANDIDATES = 8
+
+# Re-read this many bytes before the last offset so a record that was only
+# partly written at the previous scan is still matched
+SCAN_OVERLAP = 512
+
+STATE_FILE = "token_scan_state.json"
+
+
+class LocalTokenError(Exception):
+    """Local token scan failed with a message meant for the user"""
+
+
+LEVELDB_SUBDIR = os.path.join("slobs-client", "Local Storage", "leveldb")
+
+
+def default_root_patterns():
+    """Glob patterns for every place a Streamlabs Desktop leveldb may live"""
+    home = os.path.expanduser("~")
+    patterns = [
+        # Windows
+        os.path.join(os.environ.get("APPDATA", os.path.join(home, "AppData", "Roaming")), LEVELDB_SUBDIR),
+        # macOS
+        os.path.join(home, "Library", "Application Support", LEVELDB_SUBDIR),
+        # Linux (native / Electron default)
+        os.path.join(os.environ.get("XDG_CONFIG_HOME", os.path.join(home, ".config")), LEVELDB_SUBDIR),
+        # Flatpak sandboxes
+        os.path.join(home, ".var", "app", "*", "config", LEVELDB_SUBDIR),
+    ]
+    # Wine prefixes (default, $WINEPREFIX and per-app prefixes)
+    wine_prefixes = [os.path.join(home, ".wine"), os.path.join(home, ".local", "share", "wineprefixes", "*")]
+    if os.environ.get("WINEPREFIX"):
+        wine_prefixes.append(os.environ["WINEPREFIX"])
+    for prefix in wine_prefixes:
+        patterns.append(os.path.join(prefix, "drive_c", "users", "*", "AppData", "Roaming", LEVELDB_SUBDIR))
+        patterns.append(os.path.join(prefix, "drive_c", "users", "*", "Application Data", LEVELDB_SUBDIR))
+    return patterns
+
+
+def normalize_root(root):
+    """Accept a leveldb dir, a 'Local Storage' dir or a slobs-client dir"""
+    root = os.path.expanduser(os.path.expandvars(root))
+    for suffix in ("", "leveldb", os.path.join("Local Storage", "leveldb")):
+        candidate = os.path.join(root, suffix) if suffix else root
+        if glob.glob(os.path.join(glob.escape(candidate), "*.log")) or glob.glob(os.path.join(glob.escape(candidate), "*.ldb")):
+            return candidate
+    return None
+
+
+def discover_roots(extra_roots=()):
+    """Return every existing leveldb directory, user-configured roots first"""
+    roots = []
+    for root in extra_roots:
+        root = normalize_root(root)
+        if root and root not in roots:
+            roots.append(root)
+    for pattern in default_root_patterns():
+        for root in glob.glob(pattern):
+            root = normalize_root(root)
+            if root and root not in roots:
+                roots.append(root)
+    return roots
+
+
+class TokenScanState:
+    """Remembers (inode, size, mtime, offset, last token) per scanned log file.
+
+    With path=None the state lives in memory only.
+    """
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+        except (IOError, OSError, ValueError, TypeError):
+            data = {}
+        self.files = data.get("files", {})
+        # Local Storage key (hex) that held the token last time, for a direct read
+        self.token_key = data.get("token_key")
+        # leveldb directories found by the last discovery, so later scans skip the glob
+        self.roots = data.get("roots", [])
+        # scan_roots updates files from several threads
+        self.lock = threading.Lock()
+
+    def save(self):
+        if self.path is None:
+            return
+        try:
+            with self.lock:
+                data = {"files": dict(self.files), "token_key": self.token_key, "roots": list(self.roots)}
+            with open(self.path, "w") as file:
+                json.dump(data, file, indent=2)
+        except (IOError, OSError) as e:
+            print(f"Failed to save token scan state: {e}")
+
+    def prune(self, paths):
+        """Forget files that no longer exist"""
+        keep = set(paths)
+        with self.lock:
+            self.files = {path: entry for path, entry in self.files.items() if path in keep}
+
+
+def tokens_in(buf, start, end, limit=1):
+    """Return up to limit distinct apiTokens in buf[start:end], newest first.
+
+    Walks backwards from the end without copying the buffer, so limit=1
+    stops at the newest token.
+    """
+    tokens = []
+    pos = buf.rfind(TOKEN_KEY, start, end)
+    while pos != -1 and len(tokens) < limit:
+        match = TOKEN_VALUE.match(buf, pos + len(TOKEN_KEY), end)
+        if match:
+            token = match.group(1).decode('ascii')
+            if token not in tokens:
+                tokens.append(token)
+        # Keep walking backwards (also past truncated or malformed values)
+        pos = buf.rfind(TOKEN_KEY, start, pos + len(TOKEN_KEY) - 1)
+    return tokens
+
+
+def last_token_in(buf, start, end):
+    """Return the last apiToken in buf[start:end] without copying it, or None"""
+    tokens = tokens_in(buf, start, end)
+    return tokens[0] if tokens else None
+
+
+def scan_range(path, start, end, limit=1):
+    """Return the distinct apiTokens in bytes [start, end) of path, newest first.
+
+    The file is memory-mapped and searched from the end, so the newest tokens
+    are found without reading, decoding or copying the rest of the file.
+    """
+    if end <= start:
+        return []
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return tokens_in(mm, start, min(end, len(mm)), limit)
+
+
+def token_from_value(key, value):
+    """Return the apiToken held by a Local Storage entry, or None"""
+    # Chromium prefixes values with 0x01 for Latin-1 or 0x00 for UTF-16LE text
+    if value[:1] == b'\x00':
+        value = value[1:].decode('utf-16-le', errors='ignore').encode('utf-8')
+    elif value[:1] == b'\x01':
+        value = value[1:]
+    if key.endswith(b'apiToken'):
+        match = TOKEN_VALUE.match(value.strip(b'"') + b'"')
+        if match:
+            return match.group(1).decode('ascii')
+    return last_token_in(value, 0, len(value))
+
+
+def leveldb_tokens(directory, state, limit=1):
+    """Read tokens through the LevelDB index, newest first; works after compaction into .ldb"""
+    db = LevelDB(directory)
+    tokens = []
+    if state.token_key and limit == 1:
+        key = bytes.fromhex(state.token_key)
+        value = db.get(key)
+        token = token_from_value(key, value) if value is not None else None
+        if token:
+            return [token]
+    for key, value in db.items_by_recency():
+        if current_token().cancelled or len(tokens) >= limit:
+            break
+        token = token_from_value(key, value)
+        if token and token not in tokens:
+            if not tokens:
+                state.token_key = key.hex()
+            tokens.append(token)
+    return tokens
+
+
+def merge_tokens(newer, older, limit=MAX_CANDIDATES):
+    """Combine two newest-first token lists without duplicates"""
+    merged = list(newer)
+    merged += [token for token in older if token not in merged]
+    return merged[:limit]
+
+
+def scanned_limit(entry):
+    """How many tokens the scan behind a state entry searched for"""
+    # Entries written before token lists were kept hold the newest token only
+    return entry.get("limit", MAX_CANDIDATES) if "tokens" in entry else 1
+
+
+def entry_covers(entry, limit):
+    """True if a state entry's token list answers a scan for limit tokens"""
+    scanned = scanned_limit(entry)
+    known = entry.get("tokens") or ([entry["token"]] if entry.get("token") else [])
+    # A search that found fewer tokens than it looked for read the whole file
+    return scanned >= limit or len(known) < scanned
+
+
+def scan_file(path, state, limit=1):
+    """Return the newest token in path, reading only bytes appended since the last scan.
+
+    Up to limit distinct tokens are kept in the state entry as well, with
+    the limit they were searched for, so a later scan that wants more of
+    them does not trust a list that stopped early.
+    """
+    st = os.stat(path)
+    entry = state.files.get(path)
+    same_file = (
+        entry is not None
+        and entry.get("inode") == st.st_ino
+        and entry.get("offset", 0) <= st.st_size
+        and entry_covers(entry, limit)
+    )
+    if same_file and entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime:
+        return entry.get("token")
+
+    if same_file:
+        # LevelDB logs are append-only: only the tail can hold anything new
+        start = max(0, entry.get("offset", 0) - SCAN_OVERLAP)
+        known = entry.get("tokens") or ([entry["token"]] if entry.get("token") else [])
+        limit = max(limit, scanned_limit(entry))
+        tokens = merge_tokens(scan_range(path, start, st.st_size, limit), known, limit)
+    else:
+        # New, replaced or truncated file, or one scanned for fewer tokens
+        tokens = scan_range(path, 0, st.st_size, limit)
+    token = tokens[0] if tokens else None
+
+    with state.lock:
+        state.files[path] = {
+            "inode": st.st_ino,
+            "size": st.st_size,
+            "mtime": st.st_mtime,
+            "offset": st.st_size,
+            "token": token,
+            "tokens": tokens,
+            "limit": limit,
+        }
+    return token
+
+
+def log_files(root):
+    """Return (path, sort key) for the newest logs of root, newest first"""
+    files = []
+    for path in glob.glob(os.path.join(glob.escape(root), '*.log')):
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue
+        # LevelDB numbers its logs, a higher number is a newer log at equal mtime
+        number = int(re.sub(r"\D", "", os.path.basename(path)) or 0)
+        files.append((path, (mtime, number)))
+    files.sort(key=lambda item: item[1], reverse=True)
+    return files[:MAX_FILES_PER_ROOT]
+
+
+def scan_roots(roots, state, collect=False):
+    """Scan the logs of every root in parallel and return tokens, newest first.
+
+    Candidates are ranked by recency. Without collect, only the newest token
+    is returned: once every file newer than the best hit has been scanned
+    the remaining work is cancelled. With collect, every distinct token of
+    every file is returned in record order.
+    """
+    candidates = [item for root in roots for item in log_files(root)]
+    candidates.sort(key=lambda item: item[1], reverse=True)
+    state.prune([path for path, _ in candidates])
+    if not candidates:
+        return []
+
+    stop = threading.Event()
+    task = current_token()
+    # Without collect the newest token is all that is needed, so each file
+    # is only searched back to its last one
+    limit = MAX_CANDIDATES if collect else 1
+
+    def scan(path):
+        if stop.is_set() or task.cancelled:
+            return []
+        try:
+            scan_file(path, state, limit)
+        except (IOError, OSError, ValueError):
+            return []  # Silently skip unreadable files
+        with state.lock:
+            return list(state.files.get(path, {}).get("tokens") or [])[:limit]
+
+    rank = {path: i for i, (path, _) in enumerate(candidates)}
+    results = {}
+    executor = ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix="TokenScan")
+    try:
+        futures = {executor.submit(scan, path): path for path, _ in candidates}
+        for future in as_completed(futures):
+            results[rank[futures[future]]] = future.result()
+            if collect:
+                continue
+            # Walk ranks from the newest: stop at the first hit or unfinished file
+            for i in range(len(candidates)):
+                if i not in results:
+                    break
+                if results[i]:
+                    stop.set()
+                    return results[i][:1]
+        tokens = []
+        for i in range(len(candidates)):
+            tokens = merge_tokens(tokens, results.get(i, []), limit=None)
+        return tokens[:MAX_CANDIDATES]
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def find_local_token(state_file=STATE_FILE, extra_roots=(), validate=None):
+    """Find the newest apiToken in the Streamlabs Desktop Local Storage (blocking).
+
+    The uncompacted logs of every known root are scanned incrementally and
+    in parallel first; if they hold no token it has been compacted into
+    SSTables and is read via the LevelDB index.
+
+    With validate, every distinct candidate (newest first) is collected and
+    validate(candidates) picks the token to return.
+    """
+    state = TokenScanState(state_file)
+    cached_roots = [root for root in state.roots if os.path.isdir(root)]
+    extra = [r for r in (normalize_root(root) for root in extra_roots) if r]
+    roots = cached_roots + [root for root in extra if root not in cached_roots]
+    discovered = False
+    if not roots:
+        roots = discover_roots(extra_roots)
+        discovered = True
+    collect = validate is not None
+    limit = MAX_CANDIDATES if collect else 1
+
+    try:
+        while True:
+            if not roots:
+                raise LocalTokenError("No Streamlabs log files found. Make sure Streamlabs is installed and you're logged in using TikTok.")
+            state.roots = roots
+            tokens = scan_roots(roots, state, collect)
+            for root in roots:
+                if tokens or current_token().cancelled:
+                    break
+                tokens = leveldb_tokens(root, state, limit)
+            if tokens or current_token().cancelled or discovered:
+                break
+            # Cached roots held nothing; look again in case Streamlabs moved
+            fresh = [root for root in discover_roots(extra_roots) if root not in roots]
+            discovered = True
+            if not fresh:
+                break
+            roots = fresh
+    finally:
+        state.save()
+
+    if not tokens or current_token().cancelled:
+        return None
+    return validate(tokens) if collect else tokens[0]
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+
+class SearchDebouncer:
+    """Debounces game searches on the asyncio loop (latest query wins)"""
+
+    def __init__(self, search, on_result, debounce_ms=250):
+        # search(query) is awaited; on_result(query, categories) runs on the loop
+        self.search = search
+        self.on_result = on_result
+        self.debounce = debounce_ms / 1000.0
+        self._task = None
+
+        # Keystroke-to-render latency (ms)
+        self._submitted_at = {}
+        self.latency_count = 0
+        self.latency_total_ms = 0.0
+        self.last_latency_ms = None
+
+    def submit(self, query):
+        """Schedule a search, cancelling any query that is still pending or in flight"""
+        self.cancel()
+        self._task = asyncio.ensure_future(self._run(query, time.perf_counter()))
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self, query, submitted_at):
+        try:
+            await asyncio.sleep(self.debounce)
+            categories = await self.search(query)
+        except asyncio.CancelledError:
+            return  # Superseded by a newer keystroke
+        except Exception as e:
+            print(f"Search error: {e}")
+            return
+        self._submitted_at = {query: submitted_at}
+        self.on_result(query, categories)
+
+    def record_render(self, query):
+        """Record keystroke-to-render latency once results for query are shown"""
+        submitted_at = self._submitted_at.pop(query, None)
+        if submitted_at is None:
+            return None
+        latency_ms = (time.perf_counter() - submitted_at) * 1000
+        self.last_latency_ms = latency_ms
+        self.latency_count += 1
+        self.latency_total_ms += latency_ms
+        return latency_ms
+
+    def stats(self):
+        avg = self.latency_total_ms / self.latency_count if self.latency_count else None
+        return {
+            "renders": self.latency_count,
+            "last_latency_ms": self.last_latency_ms,
+            "avg_latency_ms": avg,
+        }
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+
+def account_snapshot(info):
+    """Reduce a getInfo payload to the fields shown in the account panel"""
+    return {
+        "username": info.get("user", {}).get("username", "Unknown"),
+        "status": info.get("application_status", {}).get("status", "Unknown"),
+        "can_be_live": info.get("can_be_live", False),
+    }
+
+
+def diff_snapshot(old, new):
+    """Return the fields of new whose value differs from old"""
+    return {key: value for key, value in new.items() if old.get(key, object()) != value}
+
+
+class LiveStatusPoller:
+    """Polls getInfo on the asyncio loop with an adaptive interval.
+
+    Fast for a while after go-live/end-live (burst()), slow when idle and with
+    exponential backoff on errors. on_update(info) is only called when the
+    account snapshot actually changed.
+    """
+
+    def __init__(self, fetch, on_update, fast_interval=5, idle_interval=60,
+                 fast_window=120, max_backoff=300):
+        # fetch() is awaited and must raise on failure
+        self.fetch = fetch
+        self.on_update = on_update
+        self.fast_interval = fast_interval
+        self.idle_interval = idle_interval
+        self.fast_window = fast_window
+        self.max_backoff = max_backoff
+        self.last_snapshot = None
+        self._fast_until = 0.0
+        self._errors = 0
+        self._wake = None
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.last_snapshot = None
+
+    def burst(self):
+        """Poll fast for fast_window seconds, starting right away"""
+        self._fast_until = time.monotonic() + self.fast_window
+        if self._wake is not None:
+            self._wake.set()
+
+    def next_interval(self):
+        if self._errors:
+            return min(self.max_backoff, self.fast_interval * (2 ** self._errors))
+        if time.monotonic() < self._fast_until:
+            return self.fast_interval
+        return self.idle_interval
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.next_interval())
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                info = await self.fetch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._errors += 1
+                print(f"Live status poll error: {e} (next poll in {self.next_interval():.0f}s)")
+                continue
+            self._errors = 0
+            snapshot = account_snapshot(info)
+            if snapshot != self.last_snapshot:
+                self.last_snapshot = snapshot
+                self.on_update(info)
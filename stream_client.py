@@ -1,3 +1,13 @@
+import asyncio
+import copy
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import ExitStack, contextmanager
+from urllib.parse import urlsplit
+
 import requests
 
 try:
@@ -7,10 +17,222 @@ try:
 except ImportError:
     RETRY_AVAILABLE = False
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+
+API_URL = "https://streamlabs.com/api/v5/slobs/tiktok"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) StreamlabsDesktop/1.17.0 Chrome/122.0.6261.156 Electron/29.3.1 Safari/537.36"
+
+
+class SearchCache:
+    """Bounded LRU/TTL cache for category search results.
+
+    A cached result is treated as complete when it holds fewer categories than
+    the largest page the server has returned so far; longer queries sharing its
+    prefix are then answered by filtering it locally. That only holds if the
+    server matches by substring on full_name, so local filtering stays off
+    until a network answer has matched the local filter, and is switched off
+    for good the first time one does not.
+    """
+
+    def __init__(self, max_entries=128, ttl=600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # query -> (stored_at, categories)
+        self._lock = threading.Lock()
+        self._max_page = 0
+        # None = unknown, True = confirmed substring matching, False = server differs
+        self.substring_matching = None
+        self.hits = 0
+        self.prefix_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, query):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._lookup(query, now)
+            if entry is not None:
+                self.hits += 1
+                return list(entry)
+            if self.substring_matching:
+                filtered = self._filter_prefix(query, now)
+                # Nothing left may just mean the server matches by alias; ask it
+                if filtered:
+                    self.prefix_hits += 1
+                    return filtered
+            self.misses += 1
+            return None
+
+    def _filter_prefix(self, query, now):
+        """Filter the longest complete cached prefix of query, or return None"""
+        needle = query.casefold()
+        for end in range(len(query) - 1, 0, -1):
+            entry = self._lookup(query[:end], now)
+            if entry is not None and len(entry) < self._max_page:
+                return [c for c in entry if needle in c["full_name"].casefold()]
+        return None
+
+    def put(self, query, categories):
+        with self._lock:
+            if self.substring_matching is not False:
+                # Check the local filter against what the server really answered
+                filtered = self._filter_prefix(query, time.monotonic())
+                if filtered is not None:
+                    expected = {c["full_name"] for c in filtered}
+                    self.substring_matching = expected == {c["full_name"] for c in categories}
+            self._max_page = max(self._max_page, len(categories))
+            self._entries[query] = (time.monotonic(), list(categories))
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _lookup(self, query, now):
+        entry = self._entries.get(query)
+        if entry is None:
+            return None
+        stored_at, categories = entry
+        if now - stored_at > self.ttl:
+            del self._entries[query]
+            self.evictions += 1
+            return None
+        self._entries.move_to_end(query)
+        return categories
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "prefix_hits": self.prefix_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class SessionPool:
+    """Pool of requests.Session objects, one checked out per concurrent call.
+
+    requests.Session is not documented as thread-safe, so no two threads ever
+    share one; each session keeps its own cookies and keep-alive connections.
+    Sessions are handed out LIFO so the most recently used (warm) one is reused.
+    """
+
+    def __init__(self, factory, max_size=4):
+        self.factory = factory
+        self.max_size = max_size
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    @contextmanager
+    def session(self):
+        s = self._acquire()
+        try:
+            yield s
+        finally:
+            self.release(s)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.max_size:
+                self._created += 1
+                return self.factory()
+        # Every session is busy; wait for one to come back
+        return self._idle.get()
+
+    def release(self, s):
+        s.last_used = time.monotonic()
+        if self._closed:
+            s.close()
+        else:
+            self._idle.put(s)
+
+    def take_stale(self, idle_for):
+        """Check out one session idle for at least idle_for seconds, or None.
+
+        The others go straight back, so callers never wait on a refresh of
+        sessions they could be using. Hand it back with release().
+        """
+        sessions = []
+        while True:
+            try:
+                sessions.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        now = time.monotonic()
+        stale = next((s for s in sessions if now - getattr(s, "last_used", 0) >= idle_for), None)
+        # Put the rest back in their original LIFO order
+        for s in reversed(sessions):
+            if s is not stale:
+                self._idle.put(s)
+        return stale
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
 
 class Stream:
-    def __init__(self, token):
-        self.s = requests.session()
+    def __init__(self, token, use_async=False, api_url=API_URL, pool_size=4):
+        # Optionally route every call through an AsyncStream on a background loop
+        self._async = AsyncStream(token, api_url=api_url) if use_async else None
+        self.token = token
+        self.api_url = api_url
+        self.headers = {
+            "user-agent": USER_AGENT,
+            "authorization": f"Bearer {token}"
+        }
+        # Search, start/end and getInfo run on different threads at once
+        self._sessions = SessionPool(self._new_session, max_size=pool_size)
+        
+        # Set default timeout for all requests (can be overridden per request)
+        self.default_timeout = 10
+
+        # Operators retype the same categories all day, keep results around
+        self.search_cache = SearchCache()
+
+        # Pre-warmed connections: refreshed before the server's idle timeout,
+        # but only while the app has been used recently
+        self.keepalive_interval = 45
+        self.keepalive_for = 600
+        self.prewarm_stats = {"connections": 0, "setup_ms": None, "first_start_ms": None, "saved_ms": None}
+        self._last_activity = time.monotonic()
+        self._start_measured = False
+        self._stats_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._keepalive_thread = None
+
+        # getInfo is served stale-while-revalidate; identical calls in flight share one request
+        self.info_ttl = 30
+        self._info = None
+        self._info_fetched_at = 0.0
+        self._info_validators = {}  # ETag / Last-Modified from the last 200
+        self._info_future = None
+        self._info_lock = threading.Lock()
+        self._info_listeners = []
+        self.info_error = None  # Exception from the last getInfo request, if it failed
+
+    def _new_session(self):
+        s = requests.session()
         # Configure retry strategy for better reliability (if available)
         if RETRY_AVAILABLE:
             retry_strategy = Retry(
@@ -19,26 +241,117 @@ class Stream:
                 status_forcelist=[429, 500, 502, 503, 504],
             )
             adapter = HTTPAdapter(max_retries=retry_strategy)
-            self.s.mount("http://", adapter)
-            self.s.mount("https://", adapter)
-        
-        # Set default timeout for all requests (can be overridden per request)
-        self.default_timeout = 10
-        
-        self.s.headers.update({
-            "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) StreamlabsDesktop/1.17.0 Chrome/122.0.6261.156 Electron/29.3.1 Safari/537.36",
-            "authorization": f"Bearer {token}"
-        })
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+        s.headers.update(self.headers)
+        return s
+
+    def close(self):
+        self._closed.set()
+        self._sessions.close()
+
+    @contextmanager
+    def _session(self, measure=False):
+        """Check out a pooled session for a real API call.
+
+        measure=True times the first such call (the first Go Live) to report
+        what pre-warming saved; startup getInfo races prewarm for sessions,
+        so it would only ever see a cold one.
+        """
+        with self._sessions.session() as s:
+            self._last_activity = time.monotonic()
+            if measure:
+                with self._stats_lock:
+                    measure = not self._start_measured
+                    self._start_measured = True
+            warm = getattr(s, "warmed", False)
+            started = time.perf_counter()
+            yield s
+            # The call left an open keep-alive connection behind
+            s.warmed = True
+            if measure:
+                self._record_first_start(warm, (time.perf_counter() - started) * 1000)
+
+    def _record_first_start(self, warm, elapsed_ms):
+        setup_ms = self.prewarm_stats["setup_ms"]
+        self.prewarm_stats["first_start_ms"] = elapsed_ms
+        self.prewarm_stats["saved_ms"] = setup_ms if warm and setup_ms is not None else 0.0
+        if warm:
+            print(f"First Go Live request took {elapsed_ms:.0f} ms on a pre-warmed connection "
+                  f"(~{self.prewarm_stats['saved_ms']:.0f} ms of DNS/TCP/TLS setup saved)")
+
+    def _touch(self, s):
+        # Any response keeps the connection open; HEAD on the host root is cheapest
+        parts = urlsplit(self.api_url)
+        started = time.perf_counter()
+        s.head(f"{parts.scheme}://{parts.netloc}/", timeout=self.default_timeout, allow_redirects=False)
+        return (time.perf_counter() - started) * 1000
+
+    def prewarm(self, connections=2):
+        """Open keep-alive connections to the API host ahead of the first real call.
+
+        Blocking; run it in the background once a token is known. The setup
+        cost is measured as cold minus warm round trip on each connection.
+        """
+        connections = min(connections, self._sessions.max_size)
+        setup = []
+        with ExitStack() as stack:
+            # Hold them all at once so each one opens its own connection
+            sessions = [stack.enter_context(self._sessions.session()) for _ in range(connections)]
+            for s in sessions:
+                try:
+                    cold = self._touch(s)
+                    warm = self._touch(s)
+                except requests.exceptions.RequestException as e:
+                    print(f"Prewarm error: {e}")
+                    continue
+                s.warmed = True
+                setup.append(max(0.0, cold - warm))
+        if setup:
+            self.prewarm_stats["connections"] = len(setup)
+            self.prewarm_stats["setup_ms"] = sum(setup) / len(setup)
+        if self._keepalive_thread is None and not self._closed.is_set():
+            self._keepalive_thread = threading.Thread(target=self._keepalive, name="StreamKeepalive", daemon=True)
+            self._keepalive_thread.start()
+        return self.prewarm_stats
+
+    def _keepalive(self):
+        while not self._closed.wait(self.keepalive_interval):
+            if time.monotonic() - self._last_activity > self.keepalive_for:
+                continue  # Idle app, let the connections go
+            # One session at a time, released right after its refresh
+            for _ in range(self._sessions.max_size):
+                s = self._sessions.take_stale(self.keepalive_interval)
+                if s is None:
+                    break
+                try:
+                    self._touch(s)
+                except requests.exceptions.RequestException:
+                    s.warmed = False
+                finally:
+                    self._sessions.release(s)
+
+    def _run(self, coro):
+        """Run an AsyncStream coroutine on the shared background loop"""
+        return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
 
     def search(self, game):
+        if self._async:
+            return self._run(self._async.search(game))
         if not game:
             return []
         game = game[:25] # If the game name exceeds 25 characters, the API will return error 500
-        url = f"https://streamlabs.com/api/v5/slobs/tiktok/info?category={game}"
+        categories = self.search_cache.get(game)
+        if categories is not None:
+            categories.append({"full_name": "Other", "game_mask_id": ""})
+            return categories
+        url = f"{self.api_url}/info?category={game}"
         try:
-            response = self.s.get(url, timeout=self.default_timeout)
+            with self._session() as session:
+                response = session.get(url, timeout=self.default_timeout)
             response.raise_for_status()
             info = response.json()
+            self.search_cache.put(game, info["categories"])
             info["categories"].append({"full_name": "Other", "game_mask_id": ""})
             return info["categories"]
         except requests.exceptions.RequestException as e:
@@ -46,7 +359,12 @@ class Stream:
             return [{"full_name": "Other", "game_mask_id": ""}]
 
     def start(self, title, category, audience_type='0'):
-        url = "https://streamlabs.com/api/v5/slobs/tiktok/stream/start"
+        if self._async:
+            result = self._run(self._async.start(title, category, audience_type))
+            if hasattr(self._async, 'id'):
+                self.id = self._async.id
+            return result
+        url = f"{self.api_url}/stream/start"
         files=(
             ('title', (None, title)),
             ('device_platform', (None, 'win32')),
@@ -54,7 +372,8 @@ class Stream:
             ('audience_type', (None, audience_type)),
         )
         try:
-            response = self.s.post(url, files=files, timeout=15)
+            with self._session(measure=True) as session:
+                response = session.post(url, files=files, timeout=15)
             response.raise_for_status()
             data = response.json()
             self.id = data["id"]
@@ -69,9 +388,12 @@ class Stream:
             return None, None
 
     def end(self):
-        url = f"https://streamlabs.com/api/v5/slobs/tiktok/stream/{self.id}/end"
+        if self._async:
+            return self._run(self._async.end())
+        url = f"{self.api_url}/stream/{self.id}/end"
         try:
-            response = self.s.post(url, timeout=self.default_timeout)
+            with self._session() as session:
+                response = session.post(url, timeout=self.default_timeout)
             response.raise_for_status()
             data = response.json()
             return data.get("success", False)
@@ -79,12 +401,218 @@ class Stream:
             print(f"End stream error: {e}")
             return False
     
-    def getInfo(self):
-        url = "https://streamlabs.com/api/v5/slobs/tiktok/info"
+    def getInfo(self, max_age=None):
+        """Return account info, served from cache while it is younger than max_age.
+
+        max_age defaults to info_ttl. An entry past the TTL is still returned
+        at once (with max_age left at None) while a background request
+        revalidates it; pass max_age=0 to wait for a fresh answer.
+        """
+        if self._async:
+            return self._run(self._async.getInfo())
+        with self._info_lock:
+            cached = self._info
+            age = time.monotonic() - self._info_fetched_at
+        if cached is not None:
+            if age <= (self.info_ttl if max_age is None else max_age):
+                return copy.deepcopy(cached)
+            if max_age is None:
+                self._revalidate_info(background=True)
+                return copy.deepcopy(cached)
+        return copy.deepcopy(self._revalidate_info(background=False))
+
+    def add_info_listener(self, callback):
+        """callback(info) runs on the revalidating thread when the payload changed"""
+        self._info_listeners.append(callback)
+
+    def _revalidate_info(self, background):
+        # Collapse concurrent callers onto the request already in flight
+        with self._info_lock:
+            future = self._info_future
+            leader = future is None
+            if leader:
+                future = self._info_future = Future()
+        if leader:
+            if background:
+                threading.Thread(target=self._fetch_info, args=(future,), name="StreamInfo", daemon=True).start()
+            else:
+                self._fetch_info(future)
+        if background:
+            return None
+        return future.result()
+
+    def _fetch_info(self, future):
+        url = f"{self.api_url}/info"
+        changed = False
         try:
-            response = self.s.get(url, timeout=self.default_timeout)
-            response.raise_for_status()
-            return response.json()
+            with self._info_lock:
+                headers = dict(self._info_validators) if self._info is not None else {}
+            with self._session() as session:
+                response = session.get(url, headers=headers, timeout=self.default_timeout)
+            if response.status_code == 304:
+                info = self._info
+            else:
+                response.raise_for_status()
+                info = response.json()
+                validators = {}
+                if response.headers.get("ETag"):
+                    validators["If-None-Match"] = response.headers["ETag"]
+                if response.headers.get("Last-Modified"):
+                    validators["If-Modified-Since"] = response.headers["Last-Modified"]
+                changed = info != self._info
+                with self._info_lock:
+                    self._info = info
+                    self._info_validators = validators
+            with self._info_lock:
+                self._info_fetched_at = time.monotonic()
+            self.info_error = None
         except requests.exceptions.RequestException as e:
             print(f"Get info error: {e}")
-            return {}
\ No newline at end of file
+            self.info_error = e
+            info = self._info if self._info is not None else {}
+        except BaseException as e:
+            with self._info_lock:
+                self._info_future = None
+            future.set_exception(e)
+            raise
+        with self._info_lock:
+            self._info_future = None
+        future.set_result(info)
+        if changed and self._info_listeners:
+            for callback in list(self._info_listeners):
+                callback(copy.deepcopy(info))
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop():
+    """Event loop on a daemon thread, used when Stream delegates to AsyncStream"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="AsyncStreamLoop", daemon=True).start()
+        return _loop
+
+
+class AsyncStream:
+    """asyncio counterpart of Stream with the same methods and return values.
+
+    All instances on an event loop share one httpx.AsyncClient, so hundreds of
+    accounts can be queried concurrently over a single connection pool.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    RETRIES = 3
+    BACKOFF_FACTOR = 0.3
+    # Like urllib3's default allowed_methods: never replay a POST (go-live/end-live)
+    RETRY_METHODS = ("GET", "HEAD")
+
+    _clients = {}  # event loop -> shared httpx.AsyncClient
+
+    def __init__(self, token, client=None, api_url=API_URL):
+        if not HTTPX_AVAILABLE:
+            raise ImportError("AsyncStream requires httpx (pip install httpx)")
+        self._client = client
+        self.api_url = api_url
+        self.default_timeout = 10
+        self.search_cache = SearchCache()
+        self.headers = {
+            "user-agent": USER_AGENT,
+            "authorization": f"Bearer {token}"
+        }
+
+    @property
+    def client(self):
+        if self._client is not None:
+            return self._client
+        loop = asyncio.get_running_loop()
+        client = AsyncStream._clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                transport=httpx.AsyncHTTPTransport(retries=self.RETRIES),
+            )
+            AsyncStream._clients[loop] = client
+        return client
+
+    @classmethod
+    async def aclose_shared(cls):
+        """Close the shared client for the running loop"""
+        client = cls._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def _request(self, method, url, **kwargs):
+        # Same status retry policy as the urllib3 Retry used by Stream
+        kwargs.setdefault("timeout", self.default_timeout)
+        retries = self.RETRIES if method.upper() in self.RETRY_METHODS else 0
+        for attempt in range(retries + 1):
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+            if response.status_code not in self.RETRY_STATUSES or attempt == retries:
+                break
+            await asyncio.sleep(self.BACKOFF_FACTOR * (2 ** attempt))
+        response.raise_for_status()
+        return response
+
+    async def search(self, game):
+        if not game:
+            return []
+        game = game[:25] # If the game name exceeds 25 characters, the API will return error 500
+        categories = self.search_cache.get(game)
+        if categories is not None:
+            categories.append({"full_name": "Other", "game_mask_id": ""})
+            return categories
+        url = f"{self.api_url}/info?category={game}"
+        try:
+            response = await self._request("GET", url)
+            info = response.json()
+            self.search_cache.put(game, info["categories"])
+            info["categories"].append({"full_name": "Other", "game_mask_id": ""})
+            return info["categories"]
+        except (ValueError, httpx.HTTPError) as e:
+            print(f"Search error: {e}")
+            return [{"full_name": "Other", "game_mask_id": ""}]
+
+    async def start(self, title, category, audience_type='0'):
+        url = f"{self.api_url}/stream/start"
+        files=(
+            ('title', (None, title)),
+            ('device_platform', (None, 'win32')),
+            ('category', (None, category)),
+            ('audience_type', (None, audience_type)),
+        )
+        try:
+            response = await self._request("POST", url, files=files, timeout=15)
+            data = response.json()
+            self.id = data["id"]
+            return data["rtmp"], data["key"]
+        except (KeyError, ValueError, httpx.HTTPError) as e:
+            print(f"Start stream error: {e}")
+            if isinstance(e, httpx.HTTPStatusError):
+                try:
+                    print("Response:", e.response.json())
+                except:
+                    print("Response:", e.response.text)
+            return None, None
+
+    async def end(self):
+        url = f"{self.api_url}/stream/{self.id}/end"
+        try:
+            response = await self._request("POST", url)
+            data = response.json()
+            return data.get("success", False)
+        except (ValueError, httpx.HTTPError) as e:
+            print(f"End stream error: {e}")
+            return False
+
+    async def getInfo(self):
+        url = f"{self.api_url}/info"
+        try:
+            response = await self._request("GET", url)
+            return response.json()
+        except (ValueError, httpx.HTTPError) as e:
+            print(f"Get info error: {e}")
+            return {}
@@ -0,0 +1,117 @@
+"""Read the Streamlabs OAuth redirect from synthetic Chrome performance-log entries"""
+import json
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from token_retriever import TokenRetriever  # noqa: E402
+
+REDIRECT_URI = "http://127.0.0.1:9/tiktok/auth"
+LOGIN_URL = "http://127.0.0.1:9/slobs/login"
+
+
+def event(method, **params):
+    """A performance-log entry as ChromeDriver reports a DevTools event"""
+    return {"level": "INFO", "timestamp": 0, "message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+class FakeDriver:
+    """Serves one batch of performance-log entries per get_log call"""
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.visited = []
+        self.commands = []
+
+    def get_log(self, kind):
+        assert kind == "performance"
+        return self.batches.pop(0) if self.batches else []
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((cmd, params))
+        return {}
+
+
+@pytest.fixture
+def retriever(tmp_path):
+    return TokenRetriever(cookies_file=str(tmp_path / "cookies.json"), login_url=LOGIN_URL, redirect_uri=REDIRECT_URI)
+
+
+def wait(retriever, driver, timeout=1.0):
+    pattern = re.compile("^" + re.escape(REDIRECT_URI))
+    return retriever._wait_for_code_cdp(driver, pattern, timeout)
+
+
+def test_redirect_response(retriever):
+    driver = FakeDriver([
+        event("Network.requestWillBeSent", requestId="1", request={"url": f"{LOGIN_URL}?x=1"}),
+        event("Network.requestWillBeSent", requestId="2", request={"url": "https://streamlabs.com/dashboard"},
+              redirectResponse={"url": f"{REDIRECT_URI}?state=s", "status": 302,
+                                "headers": {"Location": "https://streamlabs.com/dashboard?code=abc123&state=s"}}),
+    ])
+    assert wait(retriever, driver) == "abc123"
+
+
+def test_redirect_without_location_uses_next_request_url(retriever):
+    driver = FakeDriver([
+        event("Network.requestWillBeSent", requestId="2", request={"url": "https://streamlabs.com/next?code=fromurl"},
+              redirectResponse={"url": REDIRECT_URI, "status": 302, "headers": {}}),
+    ])
+    assert wait(retriever, driver) == "fromurl"
+
+
+def test_extra_info_is_paired_by_request_id(retriever):
+    driver = FakeDriver(
+        [
+            event("Network.requestWillBeSent", requestId="7", request={"url": f"{REDIRECT_URI}?state=s"}),
+            # Headers of an unrelated request never count, even with a code in them
+            event("Network.responseReceivedExtraInfo", requestId="8", headers={"location": "https://x/?code=wrong"}),
+        ],
+        [
+            event("Network.responseReceivedExtraInfo", requestId="7", headers={"LOCATION": "https://x/?code=right"}),
+        ],
+    )
+    assert wait(retriever, driver) == "right"
+
+
+def test_other_redirects_and_bad_entries_are_ignored(retriever):
+    driver = FakeDriver([
+        {"message": "not json"},
+        {"level": "INFO"},
+        event("Network.requestWillBeSent", requestId="1", request={"url": "https://www.tiktok.com/login"},
+              redirectResponse={"url": "https://www.tiktok.com/", "headers": {"location": "https://x/?code=wrong"}}),
+        event("Network.loadingFinished", requestId="1", encodedDataLength=1500),
+        event("Network.loadingFailed", requestId="3", blockedReason="inspector"),
+    ])
+    assert wait(retriever, driver, timeout=0.3) == ""
+    assert retriever.network == {"bytes": 1500, "blocked": 1}
+
+
+def test_wait_for_code_drains_old_events(retriever):
+    # The warm browser's log still holds the previous retrieval's redirect
+    stale = [event("Network.requestWillBeSent", requestId="1", request={"url": "https://x/"},
+                   redirectResponse={"url": REDIRECT_URI, "headers": {"location": "https://x/?code=old"}})]
+    fresh = [event("Network.requestWillBeSent", requestId="2", request={"url": "https://x/"},
+                   redirectResponse={"url": REDIRECT_URI, "headers": {"location": "https://x/?code=new"}})]
+    driver = FakeDriver(stale, fresh)
+    assert retriever._wait_for_code(driver, timeout=1.0) == "new"
+    assert driver.visited == [retriever.streamlabs_auth_url]
+    assert ("Network.setBlockedURLs", {"urls": []}) in driver.commands
+
+
+@pytest.mark.parametrize("location, code", [
+    ("https://streamlabs.com/dashboard?code=abc&state=s", "abc"),
+    ("https://streamlabs.com/dashboard?state=s&code=a%2Fb", "a/b"),
+    ("/relative#code=frag", "frag"),
+    ("https://streamlabs.com/dashboard?state=s", ""),
+    ("", ""),
+])
+def test_code_from_location(location, code):
+    assert TokenRetriever.code_from_location(location) == code
@@ -0,0 +1,184 @@
+"""Parse snappy-compressed tables and block-spanning log records with leveldb_reader"""
+import os
+import random
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_token_scan import LOG_BLOCK_SIZE, LogWriter, TableWriter, varint  # noqa: E402
+from leveldb_reader import (LevelDB, LevelDBError, iter_log_records, iter_table,  # noqa: E402
+                            iter_write_batch, snappy_decompress)
+
+
+# -- Minimal snappy encoder, enough to produce every element kind --------------
+
+def literal(data):
+    size = len(data) - 1
+    if size < 60:
+        return bytes([size << 2]) + data
+    extra = (size.bit_length() + 7) // 8
+    return bytes([(59 + extra) << 2]) + size.to_bytes(extra, "little") + data
+
+
+def copy(offset, length):
+    if 4 <= length <= 11 and offset < 2048:
+        return bytes([1 | ((length - 4) << 2) | ((offset >> 8) << 5), offset & 0xff])
+    if offset < 65536:
+        return bytes([2 | ((length - 1) << 2)]) + offset.to_bytes(2, "little")
+    return bytes([3 | ((length - 1) << 2)]) + offset.to_bytes(4, "little")
+
+
+def snappy_compress(data):
+    """Greedy encoder: copies of up to 64 bytes from the last 4-byte match, else literals"""
+    out = bytearray(varint(len(data)))
+    seen = {}
+    pos = pending = 0
+    while pos + 4 <= len(data):
+        match = seen.get(data[pos:pos + 4])
+        seen[data[pos:pos + 4]] = pos
+        if match is None:
+            pos += 1
+            continue
+        length = 4
+        while pos + length < len(data) and length < 64 and data[match + length] == data[pos + length]:
+            length += 1
+        if pending < pos:
+            out += literal(data[pending:pos])
+        out += copy(pos - match, length)
+        pos = pending = pos + length
+    if pending < len(data):
+        out += literal(data[pending:])
+    return bytes(out)
+
+
+# -- Snappy ----------------------------------------------------------------------
+
+def test_snappy_element_kinds():
+    text = b"abcdefgh" * 3
+    block = varint(len(text)) + literal(b"abcdefgh") + copy(8, 8) + copy(8, 8)
+    assert snappy_decompress(block) == text
+    # 2-byte and 4-byte offsets
+    long_literal = bytes(range(256)) * 300
+    block = varint(len(long_literal) + 20) + literal(long_literal) + copy(70000, 10) + copy(3000, 10)
+    expected = long_literal + long_literal[-70000:-69990]
+    expected += expected[-3000:-2990]
+    assert snappy_decompress(block) == expected
+
+
+def test_snappy_overlapping_copy_repeats():
+    assert snappy_decompress(varint(10) + literal(b"ab") + copy(2, 8)) == b"ab" * 5
+    assert snappy_decompress(varint(9) + literal(b"x") + copy(1, 8)) == b"x" * 9
+
+
+@pytest.mark.parametrize("size", [60, 61, 256, 257, 65536, 65537])
+def test_snappy_long_literal_lengths(size):
+    data = bytes(random.Random(size).randrange(256) for _ in range(size))
+    assert snappy_decompress(varint(size) + literal(data)) == data
+
+
+def test_snappy_round_trip():
+    rng = random.Random(0)
+    words = [bytes(rng.choice(b"abcdefgh") for _ in range(rng.randrange(1, 12))) for _ in range(50)]
+    for _ in range(50):
+        data = b" ".join(rng.choice(words) for _ in range(rng.randrange(0, 2000)))
+        assert snappy_decompress(snappy_compress(data)) == data
+
+
+@pytest.mark.parametrize("block", [
+    varint(4) + copy(1, 4),  # Copy before any output
+    varint(8) + literal(b"abcd") + copy(5, 4),  # Offset past the start
+    varint(5) + literal(b"abcd"),  # Length mismatch
+])
+def test_snappy_rejects_corrupt_blocks(block):
+    with pytest.raises(LevelDBError):
+        snappy_decompress(block)
+
+
+# -- Tables ----------------------------------------------------------------------
+
+class SnappyTableWriter(TableWriter):
+    """TableWriter that compresses every block as Chromium does"""
+
+    def _write_block(self, entries_data):
+        raw = bytes(entries_data) + struct.pack("<II", 0, 1)
+        data = snappy_compress(raw)
+        handle = varint(self.offset) + varint(len(data))
+        self.file.write(data + b"\x01" + b"\x00" * 4)
+        self.offset += len(data) + 5
+        return handle
+
+
+def entries(count):
+    for i in range(count):
+        yield i + 1, b"_https://streamlabs.com\x00\x01key%06d" % i, b"\x01" + (b'{"n":%d,"filler":"' % i) + b"ab" * 200 + b'"}'
+
+
+def test_snappy_table(tmp_path):
+    path = str(tmp_path / "000005.ldb")
+    writer = SnappyTableWriter(path)
+    expected = list(entries(200))
+    for sequence, key, value in expected:
+        writer.put(sequence, key, value)
+    writer.close()
+    with open(path, "rb") as f:
+        data = f.read()
+    assert os.path.getsize(path) < sum(len(value) for _, _, value in expected) / 2  # Really compressed
+    assert [(seq, key, value) for seq, _, key, value in iter_table(data)] == expected
+
+    db = LevelDB(str(tmp_path))
+    assert db.get(expected[42][1]) == expected[42][2]
+    assert next(db.items_by_recency()) == expected[-1][1:]
+
+
+# -- Logs ------------------------------------------------------------------------
+
+def write_log(path, records):
+    writer = LogWriter(path)
+    for sequence, key, value in records:
+        writer.put(sequence, key, value)
+    writer.close()
+
+
+def test_log_records_span_blocks(tmp_path):
+    path = str(tmp_path / "000003.log")
+    records = [
+        (1, b"small", b"v" * 10),
+        # FIRST + MIDDLE + LAST across three blocks
+        (2, b"huge", bytes(random.Random(2).randrange(256) for _ in range(LOG_BLOCK_SIZE * 2))),
+        (3, b"after", b"w" * 100),
+    ]
+    write_log(path, records)
+    with open(path, "rb") as f:
+        data = f.read()
+    assert len(data) > LOG_BLOCK_SIZE * 2
+    batches = [entry for record in iter_log_records(data) for entry in iter_write_batch(record)]
+    assert [(seq, key, value) for seq, _, key, value in batches] == records
+
+
+def test_log_block_trailer_padding(tmp_path):
+    # Leave fewer than 7 bytes at the end of the first block, so it is padded
+    path = str(tmp_path / "000003.log")
+    # Fragment header, batch header, kind, key length, key, 3-byte value length
+    overhead = 7 + 12 + 1 + 1 + len(b"k") + 3
+    first = (1, b"k", b"x" * (LOG_BLOCK_SIZE - overhead - 3))
+    write_log(path, [first, (2, b"next", b"y" * 50)])
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data[LOG_BLOCK_SIZE - 3:LOG_BLOCK_SIZE] == b"\x00" * 3
+    db = LevelDB(str(tmp_path))
+    assert db.get(b"k") == first[2]
+    assert db.get(b"next") == b"y" * 50
+
+
+def test_log_skips_truncated_tail(tmp_path):
+    path = str(tmp_path / "000003.log")
+    write_log(path, [(1, b"kept", b"a" * 10), (2, b"torn", b"b" * LOG_BLOCK_SIZE)])
+    with open(path, "rb") as f:
+        data = f.read()
+    # A writer that crashed mid-record leaves FIRST without its LAST
+    records = list(iter_log_records(data[:LOG_BLOCK_SIZE + 10]))
+    assert len(records) == 1
+    assert list(iter_write_batch(records[0]))[0][2] == b"kept"
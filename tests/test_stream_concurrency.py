@@ -0,0 +1,130 @@
+"""Stress Stream's pooled sessions from many threads against a local stub server"""
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stream_client import Stream  # noqa: E402
+
+THREADS = 16
+CALLS = 600
+
+
+class StubAPI(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so the session pool is exercised
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, body, status=200):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        self.server.record(self)
+        parts = urlsplit(self.path)
+        category = parse_qs(parts.query).get("category")
+        if category:
+            name = category[0]
+            self._reply({"categories": [{"full_name": f"{name} {i}", "game_mask_id": f"{name}-{i}"} for i in range(3)]})
+        else:
+            self._reply({"user": {"username": "stub"}, "application_status": {"status": "approved"}, "can_be_live": True})
+
+    def do_POST(self):
+        self.server.record(self)
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.endswith("/stream/start"):
+            with self.server.lock:
+                self.server.starts += 1
+                stream_id = self.server.starts
+            self._reply({"id": stream_id, "rtmp": "rtmp://stub/live", "key": f"key-{stream_id}"})
+        else:
+            self._reply({"success": True})
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubAPI)
+        self.lock = threading.Lock()
+        self.starts = 0
+        self.clients = set()
+        self.info_requests = 0
+
+    def record(self, handler):
+        with self.lock:
+            self.clients.add(handler.client_address)
+            if handler.command == "GET" and "category=" not in handler.path:
+                self.info_requests += 1
+
+
+@pytest.fixture
+def server():
+    server = StubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_mixed_calls_from_many_threads(server):
+    stream = Stream("token", api_url=f"http://127.0.0.1:{server.server_port}/api", pool_size=4)
+    # Fresh answers for every call so all of them hit the network
+    stream.search_cache.get = lambda query: None
+
+    def call(i):
+        kind = i % 3
+        if kind == 0:
+            name = f"game{i}"
+            categories = stream.search(name)
+            assert [c["full_name"] for c in categories] == [f"{name} 0", f"{name} 1", f"{name} 2", "Other"]
+        elif kind == 1:
+            info = stream.getInfo(max_age=0)
+            assert info["user"]["username"] == "stub"
+            assert stream.info_error is None
+        else:
+            rtmp, key = stream.start("title", "cat")
+            assert rtmp == "rtmp://stub/live" and key.startswith("key-")
+        return kind
+
+    try:
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            kinds = list(executor.map(call, range(CALLS)))
+    finally:
+        stream.close()
+
+    assert kinds.count(2) == CALLS // 3
+    # POST is never retried, so every start() reached the server exactly once
+    assert server.starts == CALLS // 3
+    # Connections are reused instead of opened per call
+    assert len(server.clients) <= 4
+
+
+def test_concurrent_get_info_is_collapsed(server):
+    stream = Stream("token", api_url=f"http://127.0.0.1:{server.server_port}/api")
+    try:
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            infos = list(executor.map(lambda _: stream.getInfo(), range(THREADS * 4)))
+    finally:
+        stream.close()
+    assert all(info["can_be_live"] for info in infos)
+    # Callers that arrive while a request is in flight share it
+    assert server.info_requests < THREADS * 4
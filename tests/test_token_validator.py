@@ -0,0 +1,103 @@
+"""Rank local token candidates with TokenValidator against a local getInfo stub"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_token import LocalTokenError  # noqa: E402
+from token_validator import TokenValidator  # noqa: E402
+
+SLOW_SECONDS = 2.0
+
+
+class StubInfo(BaseHTTPRequestHandler):
+    """Answers /info by the bearer token's name: live, valid, rejected, down or slow"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        token = self.headers.get("authorization", "").split(" ", 1)[-1]
+        kind = token.split("-", 1)[0]
+        with self.server.lock:
+            self.server.checked.append(token)
+        if kind == "slow":
+            time.sleep(SLOW_SECONDS)
+        if kind == "rejected":
+            status, body = 401, {"message": "Unauthorized"}
+        elif kind == "down":
+            status, body = 503, {}
+        else:
+            status, body = 200, {"user": {"username": token}, "can_be_live": kind in ("live", "slow")}
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubInfo)
+        self.lock = threading.Lock()
+        self.checked = []
+
+
+@pytest.fixture
+def server():
+    server = StubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def validator(server):
+    return TokenValidator(timeout=SLOW_SECONDS * 2, api_url=f"http://127.0.0.1:{server.server_port}/api")
+
+
+@pytest.mark.parametrize("candidates, expected", [
+    # Newest first: a live-capable token beats newer valid or unchecked ones
+    (["valid-1", "down-1", "live-1", "live-2"], "live-1"),
+    # Without a live one, valid beats unchecked regardless of age
+    (["down-1", "rejected-1", "valid-1", "valid-2"], "valid-1"),
+    # Offline: fall back to the newest token that could not be checked
+    (["rejected-1", "down-1", "down-2"], "down-1"),
+])
+def test_ranking(validator, candidates, expected):
+    assert validator(candidates) == expected
+
+
+def test_stops_once_newest_is_live(validator, server):
+    started = time.perf_counter()
+    assert validator(["live-1", "slow-1", "slow-2"]) == "live-1"
+    # Older candidates still in flight are not waited for
+    assert time.perf_counter() - started < SLOW_SECONDS / 2
+
+
+def test_waits_for_newer_candidates_before_a_live_one(validator):
+    # An older live token only wins once the newer slow one is known too
+    assert validator(["slow-1", "live-1"]) == "slow-1"
+
+
+def test_single_candidate_is_checked(validator, server):
+    assert validator(["down-1"]) == "down-1"
+    assert server.checked == ["down-1"]
+    with pytest.raises(LocalTokenError):
+        validator(["rejected-1"])
+
+
+def test_all_rejected(validator):
+    with pytest.raises(LocalTokenError, match="rejected all of them"):
+        validator(["rejected-1", "rejected-2", "rejected-3"])
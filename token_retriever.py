@@ -1,4 +1,5 @@
 import re
+import threading
 import time
 # seleniumbase imported lazily in retrieve_token() to avoid heavy import at module level
 import json
@@ -6,22 +7,109 @@ import requests
 import hashlib
 import os
 import base64
+import shutil
+from urllib.parse import parse_qs, urlsplit
+
+
+class ResourcePolicy:
+    """Which requests the retrieval browser skips; only the OAuth redirect matters.
+
+    Resource types map to URL patterns for Chrome's Network.setBlockedURLs.
+    A host in allow_hosts (or a subdomain of one) is never host-blocked.
+    """
+
+    TYPE_PATTERNS = {
+        "image": ("*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.ico*", "*.svg*"),
+        "media": ("*.mp4*", "*.webm*", "*.m3u8*", "*.ts?*", "*.mp3*", "*.m4a*"),
+        "font": ("*.woff*", "*.ttf*", "*.otf*", "*.eot*"),
+        "stylesheet": ("*.css*",),
+    }
+    # Images stay out of the defaults: the TikTok login captcha is image-based
+    DEFAULT_TYPES = ("media", "font")
+    DEFAULT_DENY_HOSTS = (
+        "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+        "facebook.net", "hotjar.com", "mon.tiktokv.com", "mcs.tiktokv.com",
+        "analytics.tiktok.com",
+    )
+
+    def __init__(self, types=DEFAULT_TYPES, deny_hosts=DEFAULT_DENY_HOSTS, allow_hosts=()):
+        unknown = set(types) - set(self.TYPE_PATTERNS)
+        if unknown:
+            raise ValueError(f"unknown resource types: {', '.join(sorted(unknown))}")
+        self.types = tuple(types)
+        self.deny_hosts = tuple(deny_hosts)
+        self.allow_hosts = tuple(allow_hosts)
+
+    @classmethod
+    def from_config(cls, data):
+        """Build from the resource_blocking config dict; None unless enabled"""
+        if not data or not data.get("enabled", False):
+            return None
+        return cls(
+            types=data.get("types", cls.DEFAULT_TYPES),
+            deny_hosts=data.get("deny_hosts", cls.DEFAULT_DENY_HOSTS),
+            allow_hosts=data.get("allow_hosts", ()),
+        )
+
+    def allowed(self, host):
+        return any(host == allow or host.endswith("." + allow) for allow in self.allow_hosts)
+
+    def url_patterns(self):
+        patterns = [pattern for kind in self.types for pattern in self.TYPE_PATTERNS[kind]]
+        for host in self.deny_hosts:
+            if not self.allowed(host):
+                patterns += [f"*://{host}/*", f"*://*.{host}/*"]
+        return patterns
+
 
 class TokenRetriever:
     CLIENT_KEY = "awdjaq9ide8ofrtz"
     REDIRECT_URI = "https://streamlabs.com/tiktok/auth"
     STREAMLABS_API_URL = "https://streamlabs.com/api/v5/slobs/auth/data"
+    STREAMLABS_LOGIN_URL = "https://streamlabs.com/slobs/login"
 
-    def __init__(self, cookies_file='cookies.json'):
+    # "cdp" reads the redirect from Chrome DevTools network events at native
+    # page speed; "wire" routes every request through selenium-wire's MITM proxy
+    CAPTURE_MODES = ("cdp", "wire")
+
+    def __init__(self, cookies_file='cookies.json', profile_dir=None, keep_alive=False,
+                 capture="cdp", login_url=None, redirect_uri=None, api_url=None, block=None,
+                 timings_file="retrieval_timings.json"):
+        if capture not in self.CAPTURE_MODES:
+            raise ValueError(f"capture must be one of {self.CAPTURE_MODES}")
+        self.capture = capture
+        # Overridable so the flow can run against a local OAuth stub
+        self.login_url = login_url or self.STREAMLABS_LOGIN_URL
+        self.redirect_uri = redirect_uri or self.REDIRECT_URI
+        self.api_url = api_url or self.STREAMLABS_API_URL
+        # ResourcePolicy applied before the first navigation, None loads everything
+        self.block = block
+        # Last phase timings per blocking mode, so both can be compared
+        self.timings_file = timings_file
+        self.new_challenge()
+        self.cookies_file = cookies_file
+        self.auth_code = None
+        # Persistent Chrome profiles (one per account) keep the TikTok/Streamlabs
+        # login between retrievals; None uses a throwaway profile as before
+        self.profile_dir = profile_dir
+        self.last_profile = None  # user-data-dir of the latest retrieval
+        # Keep the browser running after a retrieval so the next one skips the launch
+        self.keep_alive = keep_alive
+        self._driver = None
+        self._driver_key = None
+        self._lock = threading.Lock()
+        self.timings = {}
+        self.network = {}
+
+    def new_challenge(self):
+        """Start a fresh PKCE pair; every retrieval needs its own"""
         self.code_verifier = self.generate_code_verifier()
         self.code_challenge = self.generate_code_challenge(self.code_verifier)
         self.streamlabs_auth_url = (
-            f"https://streamlabs.com/slobs/login?"
+            f"{self.login_url}?"
             f"skip_splash=true&external=electron&tiktok=&force_verify=&origin=slobs"
             f"&code_challenge={self.code_challenge}&code_flow=true"
         )
-        self.cookies_file = cookies_file
-        self.auth_code = None
 
     @staticmethod
     def generate_code_verifier():
@@ -32,59 +120,297 @@ class TokenRetriever:
         sha256_hash = hashlib.sha256(code_verifier.encode()).digest()
         return base64.urlsafe_b64encode(sha256_hash).decode("utf-8").rstrip("=")
 
+    # A login whose account is not known yet; renamed by assign_profile()
+    PENDING_PROFILE = "_pending"
+
+    def profile_path(self, account=None):
+        """Chrome user-data-dir for account, or None without profile_dir"""
+        if not self.profile_dir:
+            return None
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", account) if account else self.PENDING_PROFILE
+        return os.path.abspath(os.path.join(self.profile_dir, name))
+
+    def select_profile(self, account=None):
+        """Reuse account's saved profile, or start a new login in the pending one"""
+        path = self.profile_path(account)
+        if account and path and os.path.isdir(path):
+            return path
+        return self.profile_path(None)
+
+    def assign_profile(self, account):
+        """File the pending profile of the last login under the account it logged into"""
+        pending = self.profile_path(None)
+        if not account or not pending or self.last_profile != pending or not os.path.isdir(pending):
+            return
+        target = self.profile_path(account)
+        with self._lock:
+            # Chrome keeps its profile locked; the next retrieval relaunches from the new path
+            if self._driver_key and self._driver_key[1] == pending:
+                self.close()
+            try:
+                if os.path.isdir(target):
+                    shutil.rmtree(target)  # The fresh login supersedes the old session
+                os.replace(pending, target)
+                self.last_profile = target
+            except OSError as e:
+                print(f"Failed to store browser profile for {account}: {e}")
+
+    COOKIE_FALLBACK_URL = "https://www.tiktok.com/transparency"
+
+    def read_cookies(self):
+        if not os.path.exists(self.cookies_file):
+            return []
+        with open(self.cookies_file, 'r') as f:
+            return json.load(f)
+
     def load_cookies(self, driver):
-        if os.path.exists(self.cookies_file):
-            with open(self.cookies_file, 'r') as f:
-                cookies = json.load(f)
-            for cookie in cookies:
-                driver.add_cookie(cookie)
-
-    def retrieve_token(self, binary_location=None):
-        code = ""
-        # Lazy import seleniumbase - heavy dependency only loaded when needed
-        from seleniumbase import SB
-
-        with SB(wire=True, headless=False, binary_location=binary_location) as sb:
-            sb.open("https://www.tiktok.com/transparency")
-            self.load_cookies(sb)
-
-            sb.open(self.streamlabs_auth_url)
-            
+        for cookie in self.read_cookies():
+            driver.add_cookie(cookie)
+
+    @staticmethod
+    def cdp_cookie(cookie):
+        """Convert a WebDriver cookie dict to a DevTools Network.CookieParam"""
+        param = {"name": cookie["name"], "value": cookie["value"]}
+        if cookie.get("domain"):
+            param["domain"] = cookie["domain"]
+        else:
+            # Host-only cookie, as add_cookie would set it on the fallback page
+            param["url"] = "https://www.tiktok.com/"
+        param["path"] = cookie.get("path", "/")
+        for key in ("secure", "httpOnly"):
+            if key in cookie:
+                param[key] = bool(cookie[key])
+        if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+            param["sameSite"] = cookie["sameSite"]
+        if cookie.get("expiry") is not None:
+            param["expires"] = float(cookie["expiry"])
+        return param
+
+    def inject_cookies(self, driver):
+        """Set every saved cookie, for all domains, in one DevTools call before any page loads.
+
+        Falls back to opening a TikTok page and add_cookie when DevTools refuses.
+        """
+        cookies = self.read_cookies()
+        if not cookies:
+            return
+        try:
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": [self.cdp_cookie(c) for c in cookies]})
+        except Exception as e:
+            print(f"DevTools cookie injection failed, loading a TikTok page instead: {e}")
+            driver.get(self.COOKIE_FALLBACK_URL)
+            self.load_cookies(driver)
+
+    def _browser_options(self, binary_location, user_data_dir):
+        return {
+            "wire": self.capture == "wire",
+            "log_cdp": self.capture == "cdp",  # Chrome performance log = CDP Network events
+            "headless": False,
+            "binary_location": binary_location,
+            "user_data_dir": user_data_dir,
+        }
+
+    def _launch(self, binary_location, user_data_dir):
+        from seleniumbase import Driver
+        return Driver(**self._browser_options(binary_location, user_data_dir))
+
+    def _warm_driver(self, binary_location, user_data_dir):
+        """Return the running browser for these options, launching one if needed"""
+        key = (binary_location, user_data_dir)
+        if self._driver is not None:
+            try:
+                self._driver.current_url  # Raises once the window was closed
+                if self._driver_key == key:
+                    return self._driver, True
+            except Exception:
+                pass
+            self.close()
+        self._driver = self._launch(binary_location, user_data_dir)
+        self._driver_key = key
+        return self._driver, False
+
+    def close(self):
+        """Quit the warm browser, if any"""
+        driver, self._driver, self._driver_key = self._driver, None, None
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Failed to close browser: {e}")
+
+    @staticmethod
+    def code_from_location(location):
+        """Extract the OAuth code from the redirect's Location header"""
+        code = parse_qs(urlsplit(location).query).get("code")
+        if code:
+            return code[0]
+        return location.split("code=")[-1] if "code=" in location else ""
+
+    def apply_blocking(self, driver):
+        """Install the resource policy in the browser through DevTools"""
+        patterns = self.block.url_patterns() if self.block else []
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except Exception as e:
+            print(f"Failed to apply resource blocking: {e}")
+
+    def _wait_for_code(self, driver, timeout=600):
+        pattern = re.compile("^" + re.escape(self.redirect_uri))
+        # Also resets the patterns a warm browser kept from the last retrieval
+        self.apply_blocking(driver)
+        # The warm browser still holds the previous retrieval's redirect
+        if self.capture == "wire":
+            # Only the auth redirect is recorded; TikTok/Streamlabs pages and
+            # their bodies pass through without being buffered
+            driver.scopes = [pattern.pattern]
+            del driver.requests
+        else:
+            driver.get_log("performance")
+        self.inject_cookies(driver)
+        self.timings["prepare"] = time.perf_counter()
+
+        if self.capture == "wire":
+            del driver.requests  # Anything the cookie fallback page left behind
+        driver.get(self.streamlabs_auth_url)
+        if self.capture == "cdp":
+            return self._wait_for_code_cdp(driver, pattern, timeout)
+        try:
+            request = driver.wait_for_request(pattern, timeout=timeout)
+            if request:
+                return self.code_from_location(request.response.headers.get("Location", ""))
+        except:
+            print("Timed out waiting for Streamlabs redirect.")
+        finally:
+            del driver.requests
+        return ""
+
+    def _wait_for_code_cdp(self, driver, pattern, timeout):
+        """Watch Network.* DevTools events for the redirect away from the auth URL"""
+        deadline = time.monotonic() + timeout
+        urls = {}  # requestId -> URL, to pair headers reported separately
+        while time.monotonic() < deadline:
             try:
-                pattern = re.compile(r"^https://streamlabs\.com/tiktok/auth")
-                request = sb.driver.wait_for_request(pattern, timeout=600)
-                if request:
-                    code = request.response.headers.get("Location", "").split("code=")[-1]
-            except:
-                print("Timed out waiting for Streamlabs redirect.")
+                entries = driver.get_log("performance")
+            except Exception as e:
+                print(f"Browser closed while waiting for Streamlabs redirect: {e}")
+                return ""
+            for entry in entries:
+                try:
+                    message = json.loads(entry["message"])["message"]
+                except (KeyError, ValueError):
+                    continue
+                params = message.get("params", {})
+                location = None
+                if message.get("method") == "Network.loadingFinished":
+                    self.network["bytes"] = self.network.get("bytes", 0) + params.get("encodedDataLength", 0)
+                elif message.get("method") == "Network.loadingFailed" and params.get("blockedReason"):
+                    self.network["blocked"] = self.network.get("blocked", 0) + 1
+                if message.get("method") == "Network.requestWillBeSent":
+                    redirect = params.get("redirectResponse")
+                    if redirect and pattern.match(redirect.get("url", "")):
+                        headers = {k.lower(): v for k, v in redirect.get("headers", {}).items()}
+                        location = headers.get("location") or params.get("request", {}).get("url", "")
+                    urls[params.get("requestId")] = params.get("request", {}).get("url", "")
+                elif message.get("method") == "Network.responseReceivedExtraInfo":
+                    if pattern.match(urls.get(params.get("requestId"), "")):
+                        headers = {k.lower(): v for k, v in params.get("headers", {}).items()}
+                        location = headers.get("location")
+                if location:
+                    code = self.code_from_location(location)
+                    if code:
+                        return code
+            time.sleep(0.2)
+        print("Timed out waiting for Streamlabs redirect.")
+        return ""
+
+    def retrieve_token(self, binary_location=None, account=None):
+        self.new_challenge()
+        user_data_dir = self.select_profile(account)
+        self.last_profile = user_data_dir
+        started = time.perf_counter()
+        self.timings = {}
+        self.network = {}
+        with self._lock:
+            if self.keep_alive:
+                driver, warm = self._warm_driver(binary_location, user_data_dir)
+                self.timings["launch"] = time.perf_counter()
+                try:
+                    code = self._wait_for_code(driver)
+                except Exception:
+                    self.close()  # Don't reuse a browser in an unknown state
+                    raise
+            else:
+                # Lazy import seleniumbase - heavy dependency only loaded when needed
+                from seleniumbase import SB
+
+                warm = False
+                with SB(**self._browser_options(binary_location, user_data_dir)) as sb:
+                    self.timings["launch"] = time.perf_counter()
+                    code = self._wait_for_code(sb.driver)
+        self.timings["login"] = time.perf_counter()
+        self.report_timings(started, warm)
         if code:
-            with requests.Session() as s:
+            return self.exchange_code(code)
+        return None
+
+    def report_timings(self, started, warm):
+        """Log this run's phases next to the last run in the other blocking mode"""
+        run = {}
+        previous = started
+        for name in ("launch", "prepare", "login"):
+            if name in self.timings:
+                run[f"{name}_ms"] = round((self.timings[name] - previous) * 1000)
+                previous = self.timings[name]
+        run.update(self.network)
+        run["warm"] = warm
+        mode = "blocking on" if self.block else "blocking off"
+        try:
+            with open(self.timings_file, "r") as f:
+                history = json.load(f)
+        except (IOError, OSError, ValueError, TypeError):
+            history = {}
+        history[mode] = run
+        if self.timings_file:
+            try:
+                with open(self.timings_file, "w") as f:
+                    json.dump(history, f, indent=2)
+            except (IOError, OSError) as e:
+                print(f"Failed to save retrieval timings: {e}")
+        for name in ("blocking on", "blocking off"):
+            if name in history:
+                entry = history[name]
+                details = ", ".join(f"{key} {value}" for key, value in entry.items())
+                print(f"Token retrieval ({name}{', this run' if name == mode else ', last run'}): {details}")
+
+    def exchange_code(self, code):
+        """Trade the OAuth code for a Streamlabs token"""
+        with requests.Session() as s:
+            try:
+                # Reduced sleep time - 2 seconds should be sufficient
+                time.sleep(2)
+                params = {
+                    "code_verifier": self.code_verifier,
+                    "code": code
+                }
+                response = s.get(self.api_url, params=params, timeout=15)
+                response.raise_for_status()
+
                 try:
-                    # Reduced sleep time - 2 seconds should be sufficient
-                    time.sleep(2)
-                    params = {
-                        "code_verifier": self.code_verifier,
-                        "code": code
-                    }
-                    response = s.get(self.STREAMLABS_API_URL, params=params, timeout=15)
-                    response.raise_for_status()
-                    
-                    try:
-                        resp_json = response.json()
-                    except json.JSONDecodeError:
-                        print("Invalid JSON response. Status code:", response.status_code)
-                        return None
-                    if resp_json.get("success"):
-                        token = resp_json["data"].get("oauth_token")
-                        print(f"Got Streamlabs OAuth token: {token}")
-                        return token
-                    else:
-                        print("Streamlabs token request failed:", resp_json)
-                        return None
-                except requests.exceptions.RequestException as e:
-                    print(f"Error requesting token from Streamlabs: {e}")
+                    resp_json = response.json()
+                except json.JSONDecodeError:
+                    print("Invalid JSON response. Status code:", response.status_code)
                     return None
-                except Exception as e:
-                    print(f"Unexpected error: {e}")
+                if resp_json.get("success"):
+                    token = resp_json["data"].get("oauth_token")
+                    print(f"Got Streamlabs OAuth token: {token}")
+                    return token
+                else:
+                    print("Streamlabs token request failed:", resp_json)
                     return None
-        return None
\ No newline at end of file
+            except requests.exceptions.RequestException as e:
+                print(f"Error requesting token from Streamlabs: {e}")
+                return None
+            except Exception as e:
+                print(f"Unexpected error: {e}")
+                return None
@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from local_token import LocalTokenError
+from stream_client import API_URL, USER_AGENT
+from worker_pool import current_token
+
+
+def fetch_info(token, timeout, api_url=API_URL):
+    """GET /info for token; returns (valid, info), valid is None when unknown"""
+    headers = {"user-agent": USER_AGENT, "authorization": f"Bearer {token}"}
+    try:
+        response = requests.get(f"{api_url}/info", headers=headers, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        print(f"Token check error: {e}")
+        return None, {}
+    if response.status_code in (401, 403):
+        return False, {}
+    if not response.ok:
+        return None, {}
+    try:
+        return True, response.json()
+    except ValueError:
+        return None, {}
+
+
+class TokenValidator:
+    """Checks local token candidates against getInfo concurrently.
+
+    Candidates come newest first. The newest token that is valid and
+    can_be_live wins; otherwise the newest valid one, then the newest that
+    could not be checked (offline). Pass api_url to point at a local stub.
+    """
+
+    def __init__(self, timeout=3.0, api_url=API_URL, max_workers=4, fetch=fetch_info):
+        self.timeout = timeout
+        self.api_url = api_url
+        self.max_workers = max_workers
+        self.fetch = fetch
+
+    def check(self, token):
+        valid, info = self.fetch(token, self.timeout, self.api_url)
+        return {"token": token, "valid": valid, "can_be_live": bool(valid and info.get("can_be_live")), "info": info}
+
+    def __call__(self, candidates):
+        if len(candidates) == 1:
+            result = self.check(candidates[0])
+            if result["valid"] is False:
+                raise LocalTokenError("The API Token found locally was rejected by Streamlabs. Log in to Streamlabs again and retry.")
+            return candidates[0]
+
+        task = current_token()
+        results = [None] * len(candidates)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="TokenCheck")
+        try:
+            futures = {executor.submit(self.check, token): i for i, token in enumerate(candidates)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if task.cancelled:
+                    return None
+                # Done once every newer candidate is known not to be live
+                for result in results:
+                    if result is None:
+                        break
+                    if result["can_be_live"]:
+                        return result["token"]
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        for wanted in (True, None):
+            for result in results:
+                if result["valid"] is wanted:
+                    return result["token"]
+        raise LocalTokenError(f"Found {len(candidates)} API Tokens locally but Streamlabs rejected all of them. Log in to Streamlabs again and retry.")
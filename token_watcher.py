@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+
+from local_token import TokenScanState, discover_roots, log_files, scan_file
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+
+class TokenWatcher:
+    """Watches the Streamlabs leveldb dirs and reports every new apiToken.
+
+    Uses native filesystem events (inotify / FSEvents / ReadDirectoryChangesW)
+    through watchdog when it is installed, otherwise polls file sizes. Only the
+    bytes appended since the last look are searched. on_token(token) is called
+    from a background thread.
+    """
+
+    def __init__(self, on_token, extra_roots=(), poll_interval=0.5, rediscover_interval=10):
+        self.on_token = on_token
+        self.extra_roots = list(extra_roots)
+        self.poll_interval = poll_interval
+        self.rediscover_interval = rediscover_interval
+        # In-memory only; the scan state file belongs to find_local_token
+        self.state = TokenScanState(path=None)
+        self.roots = []
+        self.last_token = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        """Start watching; discovery and the baseline scan run on the watcher thread"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="TokenWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        self.roots = discover_roots(self.extra_roots)
+        self._baseline()
+        if self._stop.is_set():
+            return
+        if not (WATCHDOG_AVAILABLE and self.roots):
+            self._poll()
+            return
+        observer = Observer()
+        handler = _LogEventHandler(self)
+        for root in self.roots:
+            observer.schedule(handler, root, recursive=False)
+        observer.daemon = True
+        observer.start()
+        self._stop.wait()
+        observer.stop()
+        observer.join(1.0)
+
+    def _baseline(self):
+        """Record the current end of every log so only later writes are reported"""
+        for root in self.roots:
+            for path, _ in log_files(root):
+                if self._stop.is_set():
+                    return
+                try:
+                    token = scan_file(path, self.state)
+                except (IOError, OSError, ValueError):
+                    continue
+                if token and self.last_token is None:
+                    self.last_token = token  # Newest file comes first
+
+    def file_changed(self, path):
+        """Search the tail of a log that was just written and report a new token"""
+        if not path.endswith(".log") or self._stop.is_set():
+            return
+        before = self.state.files.get(path)
+        try:
+            token = scan_file(path, self.state)
+        except (IOError, OSError, ValueError):
+            return  # Rotated away or still locked, the next event retries
+        if self.state.files.get(path) is before:
+            return  # Unchanged file; its cached token is not news
+        with self._lock:
+            if not token or token == self.last_token:
+                return
+            self.last_token = token
+        try:
+            self.on_token(token)
+        except Exception as e:
+            print(f"Token watcher callback error: {e}")
+
+    def _poll(self):
+        last_discovery = time.monotonic()
+        while not self._stop.wait(self.poll_interval):
+            if not self.roots and time.monotonic() - last_discovery >= self.rediscover_interval:
+                # Streamlabs may be installed or logged in for the first time
+                self.roots = discover_roots(self.extra_roots)
+                last_discovery = time.monotonic()
+            for root in self.roots:
+                try:
+                    names = os.listdir(root)
+                except OSError:
+                    continue
+                for name in names:
+                    # scan_file returns at once when size and mtime are unchanged
+                    self.file_changed(os.path.join(root, name))
+
+
+if WATCHDOG_AVAILABLE:
+    class _LogEventHandler(FileSystemEventHandler):
+        def __init__(self, watcher):
+            super().__init__()
+            self.watcher = watcher
+
+        def on_created(self, event):
+            if not event.is_directory:
+                self.watcher.file_changed(event.src_path)
+
+        def on_modified(self, event):
+            if not event.is_directory:
+                self.watcher.file_changed(event.src_path)
@@ -0,0 +1,159 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+class CancellationToken:
+    """Cooperative cancellation flag handed to a pool task"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+_current = threading.local()
+
+
+def current_token():
+    """Return the CancellationToken of the task running on this worker thread"""
+    return getattr(_current, "token", None) or CancellationToken()
+
+
+class WorkerPool:
+    """Fixed-size pool of daemon worker threads with per-task cancellation.
+
+    Drop-in for ThreadPoolExecutor.submit / run_in_executor, but shutdown
+    honours a deadline: a request stuck until its timeout can never keep the
+    process alive after the window closes.
+    """
+
+    def __init__(self, max_workers=4, name="WorkerPool"):
+        self.max_workers = max_workers
+        self._queue = queue.Queue()
+        self._tokens = set()
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self._active = 0
+
+        # Task duration metrics (seconds)
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self._recent = deque(maxlen=100)
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"{name}-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn, *args, token=None, **kwargs):
+        """Queue fn(*args, **kwargs) and return a concurrent.futures.Future"""
+        future = Future()
+        future.token = token or CancellationToken()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new tasks after shutdown")
+            self._tokens.add(future.token)
+        future.add_done_callback(self._on_done)
+        self._queue.put((future, fn, args, kwargs, time.perf_counter()))
+        return future
+
+    def _on_done(self, future):
+        with self._lock:
+            self._tokens.discard(future.token)
+            if future.cancelled():
+                self.cancelled += 1
+
+    def cancel(self, future):
+        """Cancel a queued task, or flag a running one to stop at its next check"""
+        future.token.cancel()
+        return future.cancel()
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args, kwargs, queued_at = item
+            if future.token.cancelled:
+                future.cancel()
+            if not future.set_running_or_notify_cancel():
+                continue  # Cancelled while queued
+            with self._lock:
+                self._active += 1
+            _current.token = future.token
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                ok = False
+            else:
+                future.set_result(result)
+                ok = True
+            finally:
+                _current.token = None
+                duration = time.perf_counter() - started
+                with self._lock:
+                    self._active -= 1
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+                    self.total_duration += duration
+                    self.max_duration = max(self.max_duration, duration)
+                    self._recent.append((duration, started - queued_at))
+
+    def shutdown(self, deadline=2.0, wait=True, cancel_futures=True):
+        """Stop accepting work, cancel what is pending and wait up to deadline seconds.
+
+        Returns True when every worker finished before the deadline.
+        """
+        with self._lock:
+            self._shutdown = True
+            tokens = list(self._tokens)
+        if cancel_futures:
+            for token in tokens:
+                token.cancel()
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    item[0].cancel()
+        for _ in self._threads:
+            self._queue.put(None)
+        if not wait:
+            return False
+        end = time.monotonic() + (deadline if deadline is not None else float("inf"))
+        for thread in self._threads:
+            thread.join(max(0.0, end - time.monotonic()))
+        return not any(thread.is_alive() for thread in self._threads)
+
+    def stats(self):
+        with self._lock:
+            finished = self.completed + self.failed
+            recent = list(self._recent)
+            return {
+                "queue_depth": self._queue.qsize(),
+                "active": self._active,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "avg_duration_ms": self.total_duration / finished * 1000 if finished else None,
+                "max_duration_ms": self.max_duration * 1000,
+                "avg_wait_ms": sum(w for _, w in recent) / len(recent) * 1000 if recent else None,
+            }